@@ -1,12 +1,16 @@
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError
 
 from app.db.session import (
     SessionLocal,
+    AsyncSessionLocal,
 )  # Assuming SessionLocal is defined here for get_db
 from app.core import security
+from app.core.principal_cache import principal_cache
 from app.schemas.token import TokenData
 from app.models import user as models_user  # Alias for clarity
 from app.crud import crud_user
@@ -21,26 +25,49 @@ def get_db():
         db.close()
 
 
+# Async session dependency, for endpoints that query with await
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
 
 async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
 ) -> models_user.User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    user = await authenticate_token(db, token)
+    if user is None:
+        raise credentials_exception
+    return user
+
+
+async def authenticate_token(db: AsyncSession, token: str) -> Optional[models_user.User]:
+    """
+    Returns the user a bearer token belongs to, or None if the token is invalid.
+    Verified principals are served from the principal cache, so repeated calls
+    with the same token skip the JWT decode and the user lookup.
+    """
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
     token_data = security.decode_access_token(token)
     if (
         token_data is None or token_data.email is None
     ):  # Check if email (subject) is missing
-        raise credentials_exception
+        return None
 
-    user = crud_user.get_user_by_email(db, email=token_data.email)
+    user = await crud_user.get_user_by_email_async(db, email=token_data.email)
     if user is None:
-        raise credentials_exception
+        return None
+    principal_cache.set(token, user, expires_at=token_data.exp)
     return user
 
 
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas import user as schemas_user
 from app.schemas import token as schemas_token
@@ -8,16 +8,27 @@ from app.crud import crud_user
 from app.core import security
 from app.api import deps  # For get_db
 from app.core.logging import get_logger, log_business_event, log_security_event
+from app.services.password_hasher import PasswordHasherBusy, password_hasher
 
 logger = get_logger("auth_api")
 
 router = APIRouter()
 
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is temporarily overloaded, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post(
     "/register", response_model=schemas_user.User, status_code=status.HTTP_201_CREATED
 )
-def register_user(user_in: schemas_user.UserCreate, request: Request, db: Session = Depends(deps.get_db)):
+async def register_user(
+    user_in: schemas_user.UserCreate, request: Request, db: AsyncSession = Depends(deps.get_async_db)
+):
     """
     Create new user.
     """
@@ -32,7 +43,7 @@ def register_user(user_in: schemas_user.UserCreate, request: Request, db: Sessio
         }
     )
     
-    db_user = crud_user.get_user_by_email(db, email=user_in.email)
+    db_user = await crud_user.get_user_by_email_async(db, email=user_in.email)
     if db_user:
         log_security_event(
             event_type="registration_duplicate_email",
@@ -46,7 +57,10 @@ def register_user(user_in: schemas_user.UserCreate, request: Request, db: Sessio
             detail="Email already registered",
         )
     
-    created_user = crud_user.create_user(db=db, user=user_in)
+    try:
+        created_user = await crud_user.create_user_async(db=db, user=user_in)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     
     log_business_event(
         event_type="user_registered",
@@ -61,9 +75,9 @@ def register_user(user_in: schemas_user.UserCreate, request: Request, db: Sessio
 
 
 @router.post("/token", response_model=schemas_token.Token)
-def login_for_access_token(
+async def login_for_access_token(
     request: Request,
-    db: Session = Depends(deps.get_db), 
+    db: AsyncSession = Depends(deps.get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     """
@@ -81,13 +95,19 @@ def login_for_access_token(
         }
     )
     
-    user = crud_user.get_user_by_email(
+    user = await crud_user.get_user_by_email_async(
         db, email=form_data.username
     )  # form_data.username is the email
-    
-    if not user or not security.verify_password(
-        form_data.password, user.hashed_password
-    ):
+
+    # bcrypt runs in the hashing process pool, off the event loop
+    try:
+        password_ok = user is not None and await password_hasher.verify(
+            form_data.password, user.hashed_password
+        )
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+
+    if not password_ok:
         log_security_event(
             event_type="login_failed",
             description="Login attempt with incorrect credentials",
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from app.services.orchestrator import FreqtradeOrchestrator
@@ -12,7 +12,10 @@ from app.schemas.api_responses import (
 from app.db import (
     session as db_session,
 )  # For get_db, if not using deps.get_db directly
-from app.crud import crud_bot
+from app.schemas.bot_schemas import TradeHistoryResponse
+from app.crud import crud_bot, crud_trade
+from app.services import analytics
+from app.services.marketplace_cache import invalidate_marketplace_cache
 from app.models import user as models_user  # For User model type hint
 from app.api import deps  # For get_current_active_user
 
@@ -94,7 +97,11 @@ async def create_bot_endpoint(
 
         if "error" in result:
             crud_bot.update_bot_status(
-                db, bot_id=derived_bot_id, tenant_id=tenant_id, status="error_creation"
+                db,
+                bot_id=derived_bot_id,
+                tenant_id=tenant_id,
+                status="error_creation",
+                db_bot=db_bot_created,
             )
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -110,6 +117,7 @@ async def create_bot_endpoint(
             exposed_host_port=result.get(
                 "port"
             ),  # Orchestrator start_bot also returns port
+            db_bot=db_bot_created,
         )
 
         return BotStatusResponse(
@@ -133,7 +141,11 @@ async def create_bot_endpoint(
             "db_bot_created" in locals() and db_bot_created
         ):  # Check if preliminary record was made
             crud_bot.update_bot_status(
-                db, bot_id=derived_bot_id, tenant_id=tenant_id, status="error_unknown"
+                db,
+                bot_id=derived_bot_id,
+                tenant_id=tenant_id,
+                status="error_unknown",
+                db_bot=db_bot_created,
             )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -165,7 +177,10 @@ async def delete_bot_endpoint(
 
         # Regardless of orchestrator result (it might have already been stopped/removed),
         # remove from DB if it was found for this tenant.
-        crud_bot.remove_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
+        crud_bot.remove_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id, db_bot=db_bot)
+        if db_bot.bot_type == "shared":
+            # A subscription or template is gone: marketplace subscriber counts changed
+            invalidate_marketplace_cache()
 
         if not stopped_by_orchestrator:
             # If orchestrator says it couldn't stop it (e.g. already gone), but we removed from DB:
@@ -182,7 +197,11 @@ async def delete_bot_endpoint(
         # If error during orchestrator interaction, the DB record still exists.
         # Update its status to reflect potential issue if needed, or just report error.
         crud_bot.update_bot_status(
-            db, bot_id=bot_id, tenant_id=current_user.tenant_id, status="error_deletion"
+            db,
+            bot_id=bot_id,
+            tenant_id=current_user.tenant_id,
+            status="error_deletion",
+            db_bot=db_bot,
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -228,14 +247,26 @@ async def get_bot_status_api_endpoint(
 
 @router.get("", response_model=List[BotStatusResponse])
 async def list_bots_for_tenant_endpoint(
+    response: Response,
     db: Session = Depends(deps.get_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
-    skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, gt=0, le=500),
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0),
 ):
-    db_bots = crud_bot.get_bots_by_tenant(
-        db, tenant_id=current_user.tenant_id, skip=skip, limit=limit
-    )
+    """
+    List the tenant's bots, oldest first. When more bots exist, the cursor for
+    the next page is returned in the X-Next-Cursor header. `skip` is still
+    accepted for older clients and ignored when a cursor is given.
+    """
+    try:
+        db_bots, next_cursor = crud_bot.get_bots_by_tenant(
+            db, tenant_id=current_user.tenant_id, limit=limit, cursor=cursor, skip=skip
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     if not db_bots:
         return []
 
@@ -336,7 +367,9 @@ async def stop_bot_endpoint(
         )
     
     # Update status to stopping
-    crud_bot.update_bot_status(db, bot_id=bot_id, tenant_id=current_user.tenant_id, status="stopping")
+    crud_bot.update_bot_status(
+        db, bot_id=bot_id, tenant_id=current_user.tenant_id, status="stopping", db_bot=db_bot
+    )
     
     # TODO: Implement graceful stop in orchestrator
     # For now, return mock response
@@ -363,7 +396,9 @@ async def restart_bot_endpoint(
         )
     
     # Update status to restarting
-    crud_bot.update_bot_status(db, bot_id=bot_id, tenant_id=current_user.tenant_id, status="restarting")
+    crud_bot.update_bot_status(
+        db, bot_id=bot_id, tenant_id=current_user.tenant_id, status="restarting", db_bot=db_bot
+    )
     
     # TODO: Implement restart logic in orchestrator
     return BotStatusResponse(
@@ -374,13 +409,25 @@ async def restart_bot_endpoint(
     )
 
 
+@router.get("/performance/summary")
+async def get_tenant_performance(
+    db: Session = Depends(deps.get_db),
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+):
+    """Get performance metrics across all bots of the current tenant"""
+    return {
+        "tenant_id": current_user.tenant_id,
+        **analytics.tenant_performance(db, tenant_id=current_user.tenant_id),
+    }
+
+
 @router.get("/{bot_id}/performance")
 async def get_bot_performance(
     bot_id: str,
     db: Session = Depends(deps.get_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
 ):
-    """Get bot performance metrics"""
+    """Get bot performance metrics computed from its synced trades"""
     db_bot = crud_bot.get_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
     if not db_bot:
         raise HTTPException(
@@ -388,26 +435,23 @@ async def get_bot_performance(
             detail=f"Bot with ID '{bot_id}' not found for your tenant.",
         )
     
-    # TODO: Implement performance metrics collection
+    performance = analytics.bot_performance(db, bot_id=bot_id)
     return {
         "bot_id": bot_id,
-        "profit_loss": 0.0,
-        "total_trades": 0,
-        "win_rate": 0.0,
-        "avg_profit": 0.0,
-        "current_balance": 0.0,
-        "message": "Performance metrics not yet implemented"
+        "profit_loss": performance["total_profit"],
+        **performance,
     }
 
 
-@router.get("/{bot_id}/trades")
+@router.get("/{bot_id}/trades", response_model=TradeHistoryResponse)
 async def get_bot_trades(
     bot_id: str,
     limit: int = Query(50, gt=0, le=500),
+    before: Optional[int] = Query(None, description="Return trades with a trade_id lower than this"),
     db: Session = Depends(deps.get_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
 ):
-    """Get bot trade history"""
+    """Get bot trade history from the local trades table"""
     db_bot = crud_bot.get_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
     if not db_bot:
         raise HTTPException(
@@ -415,13 +459,14 @@ async def get_bot_trades(
             detail=f"Bot with ID '{bot_id}' not found for your tenant.",
         )
     
-    # TODO: Implement trade history retrieval
-    return {
-        "bot_id": bot_id,
-        "trades": [],
-        "total_count": 0,
-        "message": "Trade history not yet implemented"
-    }
+    trades = crud_trade.get_trades(db, bot_id=bot_id, limit=limit, before_trade_id=before)
+    
+    return TradeHistoryResponse(
+        bot_id=bot_id,
+        trades=trades,
+        total_count=crud_trade.count_trades(db, bot_id=bot_id),
+        next_before=trades[-1].trade_id if len(trades) == limit else None,
+    )
 
 
 @router.put("/{bot_id}/config", response_model=BotStatusResponse)
@@ -1,34 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
+from datetime import datetime, timezone
 
 from app.schemas.bot_schemas import (
     ExternalBotCreate,
     BotConnectionTest,
     BotResponse,
     BotStatusResponse,
+    FleetBotStatus,
+    FleetStatusResponse,
+    TradeHistoryResponse,
 )
-from app.services.external_bot_manager import ExternalBotManager
+from app.services.external_bot_manager import external_bot_manager, normalize_bot_data
+from app.services.trade_sync import trade_syncer
+from app.services.status_writer import bot_status_writer
 from app.db import session as db_session
-from app.crud import crud_bot
+from app.crud import crud_bot, crud_trade
 from app.models import user as models_user, bot as models_bot
 from app.api import deps
+from app.core.config import EXTERNAL_BOT_FLEET_CONCURRENCY, EXTERNAL_BOT_FLEET_DEADLINE
 from app.core.logging import get_logger, log_business_event, log_security_event
 
 logger = get_logger("external_bots_api")
 
 router = APIRouter()
-external_bot_manager = ExternalBotManager()
 
 
 @router.get("", response_model=List[BotResponse])
 async def list_external_bots(
-    db: Session = Depends(deps.get_db),
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
+    limit: int = Query(100, gt=0, le=500),
+    cursor: Optional[str] = None,
 ):
     """
-    Get all external bots for the current user/tenant
+    Get the external bots of the current user/tenant, one page at a time.
+    When more bots exist, the cursor for the next page is returned in the
+    X-Next-Cursor header.
     """
     logger.info(
         "User requesting external bots list",
@@ -39,15 +51,18 @@ async def list_external_bots(
         }
     )
     
-    # Get all external bots for this tenant
-    db_bots = (
-        db.query(models_bot.Bot)
-        .filter(
-            models_bot.Bot.tenant_id == current_user.tenant_id,
-            models_bot.Bot.bot_type == "external",
+    try:
+        db_bots, next_cursor = await crud_bot.get_bots_by_tenant_async(
+            db,
+            tenant_id=current_user.tenant_id,
+            limit=limit,
+            cursor=cursor,
+            bot_type="external",
         )
-        .all()
-    )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     bots_response = []
     for db_bot in db_bots:
@@ -60,6 +75,8 @@ async def list_external_bots(
             description=db_bot.description,
             status=db_bot.status,
             api_url=db_bot.api_url,
+            last_ping=db_bot.last_ping,
+            connection_error=db_bot.connection_error,
             created_at=db_bot.created_at,
             updated_at=db_bot.updated_at,
         ))
@@ -77,6 +94,92 @@ async def list_external_bots(
     return bots_response
 
 
+@router.get("/status", response_model=FleetStatusResponse)
+async def get_external_bots_fleet_status(
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: models_user.User = Depends(deps.get_current_active_user),
+):
+    """
+    Get real-time status for all external bots of the current user/tenant.
+    
+    Bots are queried concurrently with a bounded fan-out; bots that do not
+    answer within the per-bot deadline are reported with status "timeout".
+    """
+    version = bot_status_writer.version
+    result = await db.execute(
+        select(models_bot.Bot).where(
+            models_bot.Bot.tenant_id == current_user.tenant_id,
+            models_bot.Bot.bot_type == "external",
+        )
+    )
+    db_bots = result.scalars().all()
+
+    results = await external_bot_manager.get_fleet_status(
+        [
+            {
+                "bot_id": db_bot.bot_id,
+                "api_url": db_bot.api_url,
+                "auth_method": db_bot.auth_method,
+                "api_token": db_bot.api_token,
+                "username": db_bot.username,
+                "password": db_bot.password,
+            }
+            for db_bot in db_bots
+        ],
+        max_concurrency=EXTERNAL_BOT_FLEET_CONCURRENCY,
+        deadline=EXTERNAL_BOT_FLEET_DEADLINE,
+    )
+
+    fleet = []
+    now = datetime.now(timezone.utc)
+    for db_bot in db_bots:
+        result = results[db_bot.bot_id]
+        bot_status_writer.seed(db_bot, version)
+        if result["success"]:
+            bot_status_writer.record(db_bot.id, status="running", connection_error=None, last_ping=now)
+            fleet.append(FleetBotStatus(
+                bot_id=db_bot.bot_id,
+                name=db_bot.name,
+                status="running",
+                message="Bot is running normally",
+                connection_health={
+                    "last_ping": result["timestamp"],
+                    "success": True,
+                    "circuit": external_bot_manager.get_circuit_state(db_bot.api_url),
+                },
+                bot_data=normalize_bot_data(result["data"]),
+            ))
+        else:
+            timed_out = result.get("timed_out", False)
+            bot_status_writer.record(db_bot.id, status="error", connection_error=result["error"])
+            fleet.append(FleetBotStatus(
+                bot_id=db_bot.bot_id,
+                name=db_bot.name,
+                status="timeout" if timed_out else "error",
+                timed_out=timed_out,
+                message=f"Connection failed: {result['message']}",
+                connection_health={
+                    "success": False,
+                    "error": result["error"],
+                    "circuit": external_bot_manager.get_circuit_state(db_bot.api_url),
+                },
+            ))
+
+    timed_out_count = sum(1 for bot in fleet if bot.timed_out)
+    logger.info(
+        f"Returning live status for {len(fleet)} external bots",
+        extra={
+            "event_type": "external_bots_fleet_status",
+            "user_id": str(current_user.id),
+            "tenant_id": current_user.tenant_id,
+            "bot_count": len(fleet),
+            "timed_out_count": timed_out_count,
+        }
+    )
+
+    return FleetStatusResponse(total=len(fleet), timed_out=timed_out_count, bots=fleet)
+
+
 @router.post("/test-connection")
 async def test_bot_connection(
     connection_test: BotConnectionTest,
@@ -95,7 +198,7 @@ async def test_bot_connection(
         }
     )
     
-    result = external_bot_manager.test_bot_connection(
+    result = await external_bot_manager.test_bot_connection(
         api_url=connection_test.api_url,
         auth_method=connection_test.auth_method,
         api_token=connection_test.api_token,
@@ -143,14 +246,14 @@ async def test_bot_connection(
 )
 async def connect_external_bot(
     bot_data: ExternalBotCreate,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
 ):
     """
     Connect to an external FreqTrade bot and add it to user's dashboard
     """
     # First test the connection
-    connection_result = external_bot_manager.test_bot_connection(
+    connection_result = await external_bot_manager.test_bot_connection(
         api_url=bot_data.api_url,
         auth_method=bot_data.auth_method,
         api_token=bot_data.api_token,
@@ -168,15 +271,16 @@ async def connect_external_bot(
     bot_id = f"ext_{current_user.tenant_id}_{str(uuid.uuid4())[:8]}"
 
     # Check if bot with same URL already exists for this tenant
-    existing_bot = (
-        db.query(models_bot.Bot)
-        .filter(
+    result = await db.execute(
+        select(models_bot.Bot.id)
+        .where(
             models_bot.Bot.tenant_id == current_user.tenant_id,
             models_bot.Bot.api_url == bot_data.api_url,
             models_bot.Bot.bot_type == "external",
         )
-        .first()
+        .limit(1)
     )
+    existing_bot = result.first()
 
     if existing_bot:
         raise HTTPException(
@@ -199,10 +303,13 @@ async def connect_external_bot(
         "status": "connected",
     }
 
-    db_bot = crud_bot.create_bot(
+    db_bot = await crud_bot.create_bot_async(
         db, bot_data=db_bot_data, tenant_id=current_user.tenant_id
     )
 
+    # Pull the bot's existing trade history right away instead of waiting for the next sync cycle
+    trade_syncer.sync_bot_soon(db_bot)
+
     return BotResponse(
         id=db_bot.id,
         bot_id=db_bot.bot_id,
@@ -220,21 +327,22 @@ async def connect_external_bot(
 @router.get("/{bot_id}/status", response_model=BotStatusResponse)
 async def get_external_bot_status(
     bot_id: str,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
 ):
     """
     Get real-time status from an external FreqTrade bot
     """
     # Get bot from database
-    db_bot = crud_bot.get_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
+    version = bot_status_writer.version
+    db_bot = await crud_bot.get_bot_async(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
     if not db_bot or db_bot.bot_type != "external":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="External bot not found"
         )
 
     # Get live status from the bot
-    status_result = external_bot_manager.get_bot_status(
+    status_result = await external_bot_manager.get_bot_status(
         api_url=db_bot.api_url,
         auth_method=db_bot.auth_method or "token",
         api_token=db_bot.api_token,
@@ -242,24 +350,18 @@ async def get_external_bot_status(
         password=db_bot.password
     )
 
+    # Persisted through the write buffer: coalesced with other status writes
+    # and skipped when nothing changed
+    bot_status_writer.seed(db_bot, version)
     if status_result["success"]:
-        # Update last ping time
-        crud_bot.update_bot_status(
-            db,
-            bot_id=bot_id,
-            tenant_id=current_user.tenant_id,
+        bot_status_writer.record(
+            db_bot.id,
             status="running",
             connection_error=None,
+            last_ping=datetime.now(timezone.utc),
         )
 
-        # Ensure bot_data is always a dictionary
-        bot_data = status_result["data"]
-        if isinstance(bot_data, list):
-            # If the API returns a list (e.g., trades), wrap it in a dictionary
-            bot_data = {"trades": bot_data}
-        elif not isinstance(bot_data, dict):
-            # If it's neither list nor dict, wrap it in a generic structure
-            bot_data = {"raw_data": bot_data}
+        bot_data = normalize_bot_data(status_result["data"])
 
         return BotStatusResponse(
             bot_id=bot_id,
@@ -269,15 +371,13 @@ async def get_external_bot_status(
             connection_health={
                 "last_ping": status_result["timestamp"],
                 "success": True,
+                "circuit": external_bot_manager.get_circuit_state(db_bot.api_url),
             },
             bot_data=bot_data,
         )
     else:
-        # Update connection error
-        crud_bot.update_bot_status(
-            db,
-            bot_id=bot_id,
-            tenant_id=current_user.tenant_id,
+        bot_status_writer.record(
+            db_bot.id,
             status="error",
             connection_error=status_result["error"],
         )
@@ -287,26 +387,30 @@ async def get_external_bot_status(
             bot_type="external",
             status="error",
             message=f"Connection failed: {status_result['message']}",
-            connection_health={"success": False, "error": status_result["error"]},
+            connection_health={
+                "success": False,
+                "error": status_result["error"],
+                "circuit": external_bot_manager.get_circuit_state(db_bot.api_url),
+            },
         )
 
 
 @router.post("/{bot_id}/start")
 async def start_external_bot(
     bot_id: str,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
 ):
     """
     Send start command to external FreqTrade bot
     """
-    db_bot = crud_bot.get_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
+    db_bot = await crud_bot.get_bot_async(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
     if not db_bot or db_bot.bot_type != "external":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="External bot not found"
         )
 
-    result = external_bot_manager.start_bot(
+    result = await external_bot_manager.start_bot(
         api_url=db_bot.api_url,
         auth_method=db_bot.auth_method or "token",
         api_token=db_bot.api_token,
@@ -315,9 +419,11 @@ async def start_external_bot(
     )
 
     if result["success"]:
-        crud_bot.update_bot_status(
-            db, bot_id=bot_id, tenant_id=current_user.tenant_id, status="starting"
+        await crud_bot.update_bot_status_async(
+            db, bot_id=bot_id, tenant_id=current_user.tenant_id, status="starting", db_bot=db_bot
         )
+        # Keep the write buffer from comparing later polls against the old status
+        bot_status_writer.note_written(db_bot.id, status="starting")
         return {"success": True, "message": "Start command sent to bot"}
     else:
         return {
@@ -330,19 +436,19 @@ async def start_external_bot(
 @router.post("/{bot_id}/stop")
 async def stop_external_bot(
     bot_id: str,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
 ):
     """
     Send stop command to external FreqTrade bot
     """
-    db_bot = crud_bot.get_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
+    db_bot = await crud_bot.get_bot_async(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
     if not db_bot or db_bot.bot_type != "external":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="External bot not found"
         )
 
-    result = external_bot_manager.stop_bot(
+    result = await external_bot_manager.stop_bot(
         api_url=db_bot.api_url,
         auth_method=db_bot.auth_method or "token",
         api_token=db_bot.api_token,
@@ -351,9 +457,11 @@ async def stop_external_bot(
     )
 
     if result["success"]:
-        crud_bot.update_bot_status(
-            db, bot_id=bot_id, tenant_id=current_user.tenant_id, status="stopping"
+        await crud_bot.update_bot_status_async(
+            db, bot_id=bot_id, tenant_id=current_user.tenant_id, status="stopping", db_bot=db_bot
         )
+        # Keep the write buffer from comparing later polls against the old status
+        bot_status_writer.note_written(db_bot.id, status="stopping")
         return {"success": True, "message": "Stop command sent to bot"}
     else:
         return {
@@ -366,19 +474,19 @@ async def stop_external_bot(
 @router.get("/{bot_id}/performance")
 async def get_external_bot_performance(
     bot_id: str,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
 ):
     """
     Get performance metrics from external FreqTrade bot
     """
-    db_bot = crud_bot.get_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
+    db_bot = await crud_bot.get_bot_async(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
     if not db_bot or db_bot.bot_type != "external":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="External bot not found"
         )
 
-    result = external_bot_manager.get_bot_performance(
+    result = await external_bot_manager.get_bot_performance(
         api_url=db_bot.api_url,
         auth_method=db_bot.auth_method or "token",
         api_token=db_bot.api_token,
@@ -399,54 +507,45 @@ async def get_external_bot_performance(
         )
 
 
-@router.get("/{bot_id}/trades")
+@router.get("/{bot_id}/trades", response_model=TradeHistoryResponse)
 async def get_external_bot_trades(
     bot_id: str,
-    limit: int = 50,
-    db: Session = Depends(deps.get_db),
+    limit: int = Query(50, gt=0, le=500),
+    before: Optional[int] = Query(None, description="Return trades with a trade_id lower than this"),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
 ):
     """
-    Get trade history from external FreqTrade bot
+    Get trade history of an external FreqTrade bot.
+    
+    Served from the local trades table, which the trade syncer keeps up to date.
     """
-    db_bot = crud_bot.get_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
+    db_bot = await crud_bot.get_bot_async(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
     if not db_bot or db_bot.bot_type != "external":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="External bot not found"
         )
 
-    result = external_bot_manager.get_bot_trades(
-        api_url=db_bot.api_url,
-        auth_method=db_bot.auth_method or "token",
-        api_token=db_bot.api_token,
-        username=db_bot.username,
-        password=db_bot.password,
-        limit=limit
-    )
+    trades = await crud_trade.get_trades_async(db, bot_id=bot_id, limit=limit, before_trade_id=before)
 
-    if result["success"]:
-        return {
-            "bot_id": bot_id,
-            "trades": result["data"],
-            "timestamp": result["timestamp"],
-        }
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Failed to get trades: {result['message']}",
-        )
+    return TradeHistoryResponse(
+        bot_id=bot_id,
+        trades=trades,
+        total_count=await crud_trade.count_trades_async(db, bot_id=bot_id),
+        next_before=trades[-1].trade_id if len(trades) == limit else None,
+    )
 
 
 @router.get("/{bot_id}/ping")
 async def ping_external_bot(
     bot_id: str,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
 ):
     """
     Ping an external FreqTrade bot to check connectivity
     """
-    db_bot = crud_bot.get_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
+    db_bot = await crud_bot.get_bot_async(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
     if not db_bot or db_bot.bot_type != "external":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="External bot not found"
@@ -477,20 +576,21 @@ async def ping_external_bot(
 @router.delete("/{bot_id}")
 async def disconnect_external_bot(
     bot_id: str,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
 ):
     """
     Disconnect an external bot (remove from dashboard)
     """
-    db_bot = crud_bot.get_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
+    db_bot = await crud_bot.get_bot_async(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
     if not db_bot or db_bot.bot_type != "external":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="External bot not found"
         )
 
     # Remove bot from database
-    crud_bot.remove_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
+    bot_status_writer.discard(db_bot.id)
+    await crud_bot.remove_bot_async(db, bot_id=bot_id, tenant_id=current_user.tenant_id, db_bot=db_bot)
 
     return {
         "success": True,
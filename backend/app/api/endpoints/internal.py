@@ -0,0 +1,130 @@
+import secrets
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import DEBUG, INTERNAL_METRICS_TOKEN
+from app.core.logging import get_logging_stats
+from app.core.metrics import metrics
+from app.core.principal_cache import principal_cache
+from app.db import session as db_session
+from app.db.pool import describe_pool
+from app.services.bot_stream_hub import bot_stream_hub
+from app.services.external_bot_manager import external_bot_manager
+from app.services.marketplace_cache import marketplace_cache
+from app.services.status_writer import bot_status_writer
+from app.services.password_hasher import password_hasher
+
+router = APIRouter()
+# Mounted at the application root, where Prometheus expects /metrics
+metrics_router = APIRouter()
+
+
+def verify_internal_access(
+    x_internal_token: Optional[str] = Header(None),
+    authorization: Optional[str] = Header(None),
+) -> None:
+    """
+    Internal endpoints require the INTERNAL_METRICS_TOKEN in X-Internal-Token,
+    or as a bearer token (which is what Prometheus scrape configs send).
+    Without a configured token they are only served in DEBUG mode.
+    """
+    if INTERNAL_METRICS_TOKEN:
+        token = x_internal_token
+        if token is None and authorization and authorization.lower().startswith("bearer "):
+            token = authorization[7:]
+        if token and secrets.compare_digest(token, INTERNAL_METRICS_TOKEN):
+            return
+    elif DEBUG:
+        return
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+@router.get("/metrics", dependencies=[Depends(verify_internal_access)])
+async def get_internal_metrics():
+    """
+    Process-local runtime metrics of this worker: database connection pools
+    (occupancy and checkout waits), external bot client caches, the
+    marketplace and principal caches, the bot status write buffer, the
+    password hashing pool, the WebSocket bot pollers and the logging queue.
+    """
+    return {
+        "db_pool": {
+            "sync": describe_pool(db_session.engine.pool),
+            "async": describe_pool(db_session.async_engine.pool),
+        },
+        "external_bots": external_bot_manager.stats(),
+        "marketplace_cache": marketplace_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "bot_status_writes": bot_status_writer.stats(),
+        "password_hasher": password_hasher.stats(),
+        "bot_streams": bot_stream_hub.stats(),
+        "logging": get_logging_stats(),
+    }
+
+
+def _cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {
+        "external_bots": external_bot_manager.cache.stats(),
+        "marketplace": marketplace_cache.stats(),
+        "principal": principal_cache.stats(),
+    }
+
+
+def _cache_lookups() -> Dict[tuple, float]:
+    values = {}
+    for name, stats in _cache_stats().items():
+        values[(name, "hit")] = stats["hits"]
+        values[(name, "stale_hit")] = stats["stale_hits"]
+        values[(name, "miss")] = stats["misses"]
+    return values
+
+
+def _db_pool_checked_out() -> Dict[tuple, float]:
+    values = {}
+    for name, engine in (("sync", db_session.engine), ("async", db_session.async_engine)):
+        checked_out = describe_pool(engine.pool).get("checked_out")
+        if checked_out is not None:
+            values[(name,)] = checked_out
+    return values
+
+
+metrics.sampled(
+    "tradewise_cache_lookups_total",
+    "In-process cache lookups by cache and result; hit rate is (hit + stale_hit) / all",
+    ("cache", "result"),
+    _cache_lookups,
+    type_name="counter",
+)
+metrics.sampled(
+    "tradewise_cache_entries",
+    "Entries held by each in-process cache",
+    ("cache",),
+    lambda: {(name,): stats["entries"] for name, stats in _cache_stats().items()},
+)
+metrics.sampled(
+    "tradewise_db_pool_checked_out_connections",
+    "Database connections currently checked out of the pool, by engine",
+    ("engine",),
+    _db_pool_checked_out,
+)
+metrics.sampled(
+    "tradewise_bot_stream_pollers",
+    "Bots polled for WebSocket subscribers (one shared poller each)",
+    (),
+    lambda: {(): bot_stream_hub.stats()["bots"]},
+)
+metrics.sampled(
+    "tradewise_bot_stream_polls_total",
+    "Upstream status calls made by the WebSocket bot pollers",
+    (),
+    lambda: {(): bot_stream_hub.stats()["polls"]},
+    type_name="counter",
+)
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(verify_internal_access)])
+async def get_prometheus_metrics():
+    """Metrics of this worker in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
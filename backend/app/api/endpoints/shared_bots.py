@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session, aliased
 
 from app.schemas.bot_schemas import (
     SharedBotMarketplace,
@@ -11,6 +13,12 @@ from app.db import session as db_session
 from app.crud import crud_bot
 from app.models import user as models_user, bot as models_bot
 from app.api import deps
+from app.services import analytics
+from app.services.marketplace_cache import (
+    cache_marketplace,
+    get_cached_marketplace,
+    invalidate_marketplace_cache,
+)
 
 router = APIRouter()
 
@@ -23,20 +31,33 @@ async def get_shared_bots_marketplace(
     """
     Get list of available shared bots in the marketplace
     """
-    # Get all public shared bots
-    shared_bots = db.query(models_bot.Bot).filter(
-        models_bot.Bot.bot_type == "shared",
-        models_bot.Bot.is_public == True
-    ).all()
+    cached = get_cached_marketplace()
+    if cached is not None:
+        return cached
+
+    # Get all public shared bots with their subscriber counts in one aggregate query.
+    # Subscribers are bots using the same config template, not counting the original's tenant.
+    template = aliased(models_bot.Bot)
+    subscriber = aliased(models_bot.Bot)
+    shared_bots = (
+        db.query(template, func.count(subscriber.id))
+        .outerjoin(
+            subscriber,
+            and_(
+                subscriber.config_template == template.config_template,
+                subscriber.tenant_id != template.tenant_id,
+            ),
+        )
+        .filter(
+            template.bot_type == "shared",
+            template.is_public.is_(True)
+        )
+        .group_by(template.id)
+        .all()
+    )
     
     marketplace_bots = []
-    for bot in shared_bots:
-        # Count subscribers for this bot
-        subscribers_count = db.query(models_bot.Bot).filter(
-            models_bot.Bot.config_template == bot.config_template,
-            models_bot.Bot.tenant_id != bot.tenant_id  # Don't count the original
-        ).count()
-        
+    for bot, subscribers_count in shared_bots:
         marketplace_bots.append(SharedBotMarketplace(
             bot_id=bot.bot_id,
             name=bot.name or "Unnamed Strategy",
@@ -48,6 +69,7 @@ async def get_shared_bots_marketplace(
             strategy_type="dca"    # TODO: Determine from config
         ))
     
+    cache_marketplace(marketplace_bots)
     return marketplace_bots
 
 
@@ -102,6 +124,7 @@ async def subscribe_to_shared_bot(
     }
     
     user_bot = crud_bot.create_bot(db, bot_data=db_bot_data, tenant_id=current_user.tenant_id)
+    invalidate_marketplace_cache()
     
     return BotResponse(
         id=user_bot.id,
@@ -137,7 +160,8 @@ async def unsubscribe_from_shared_bot(
         )
     
     # Remove the subscription
-    crud_bot.remove_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id)
+    crud_bot.remove_bot(db, bot_id=bot_id, tenant_id=current_user.tenant_id, db_bot=user_bot)
+    invalidate_marketplace_cache()
     
     return {
         "success": True,
@@ -147,16 +171,28 @@ async def unsubscribe_from_shared_bot(
 
 @router.get("/my-subscriptions", response_model=List[BotResponse])
 async def get_my_shared_bot_subscriptions(
+    response: Response,
     db: Session = Depends(deps.get_db),
     current_user: models_user.User = Depends(deps.get_current_active_user),
+    limit: int = Query(100, gt=0, le=500),
+    cursor: Optional[str] = None,
 ):
     """
-    Get user's shared bot subscriptions
+    Get user's shared bot subscriptions, one page at a time.
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
-    user_shared_bots = db.query(models_bot.Bot).filter(
-        models_bot.Bot.tenant_id == current_user.tenant_id,
-        models_bot.Bot.bot_type == "shared"
-    ).all()
+    try:
+        user_shared_bots, next_cursor = crud_bot.get_bots_by_tenant(
+            db,
+            tenant_id=current_user.tenant_id,
+            limit=limit,
+            cursor=cursor,
+            bot_type="shared",
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return [
         BotResponse(
@@ -193,20 +229,19 @@ async def get_shared_bot_performance(
             detail="Shared bot not found"
         )
     
-    # TODO: Get actual performance data from the shared bot instance
-    # For now, return mock data
+    # Performance of the strategy across every bot running this template
+    trades = analytics.template_trade_arrays(db, config_template=user_bot.config_template)
+    performance = analytics.compute_performance(trades)
     return {
         "bot_id": bot_id,
         "strategy": user_bot.config_template,
         "performance_data": {
-            "total_return": 0.0,
-            "monthly_return": 0.0,
-            "total_trades": 0,
-            "win_rate": 0.0,
-            "sharpe_ratio": 0.0,
-            "max_drawdown": 0.0
+            "total_return": performance["total_profit_ratio"],
+            "monthly_return": analytics.profit_ratio_since(
+                trades, datetime.now(timezone.utc) - timedelta(days=30)
+            ),
+            **performance,
         },
-        "message": "Performance tracking not yet implemented for shared bots"
     }
 
 
@@ -238,6 +273,7 @@ async def create_shared_bot_template(
     }
     
     template_bot = crud_bot.create_bot(db, bot_data=db_bot_data, tenant_id="platform")
+    invalidate_marketplace_cache()
     
     return BotResponse(
         id=template_bot.id,
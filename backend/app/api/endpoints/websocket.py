@@ -1,14 +1,15 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException
-from typing import List, Dict
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from typing import List, Dict, Optional, Tuple
 import json
 import asyncio
 import logging
-from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.metrics import websocket_connections
 from app.crud import crud_bot
-from app.services.orchestrator import FreqtradeOrchestrator
+from app.db.session import AsyncSessionLocal
 from app.models import user as models_user
+from app.services.bot_stream_hub import BotStreamSubscriber, bot_stream_hub
 
 logger = logging.getLogger(__name__)
 
@@ -18,24 +19,26 @@ router = APIRouter()
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, List[WebSocket]] = {}
-    
+
     async def connect(self, websocket: WebSocket, tenant_id: str):
         await websocket.accept()
         if tenant_id not in self.active_connections:
             self.active_connections[tenant_id] = []
         self.active_connections[tenant_id].append(websocket)
+        websocket_connections.inc("tenant")
         logger.info(f"WebSocket connected for tenant: {tenant_id}")
-    
+
     def disconnect(self, websocket: WebSocket, tenant_id: str):
-        if tenant_id in self.active_connections:
+        if websocket in self.active_connections.get(tenant_id, []):
             self.active_connections[tenant_id].remove(websocket)
+            websocket_connections.dec("tenant")
             if not self.active_connections[tenant_id]:
                 del self.active_connections[tenant_id]
         logger.info(f"WebSocket disconnected for tenant: {tenant_id}")
-    
+
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
-    
+
     async def broadcast_to_tenant(self, message: str, tenant_id: str):
         if tenant_id in self.active_connections:
             for connection in self.active_connections[tenant_id]:
@@ -46,147 +49,123 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+
+async def authorize_websocket(
+    token: str, bot_id: Optional[str] = None
+) -> Tuple[Optional[models_user.User], list, int]:
+    """
+    The active user a JWT token belongs to, the external bots of their
+    tenant to watch (only bot_id when given) and the status write buffer
+    version the bots were loaded at. Returns (None, [], version) for an
+    invalid token or an inactive user.
+    """
+    version = bot_stream_hub.writer.version
+    async with AsyncSessionLocal() as db:
+        user = await deps.authenticate_token(db, token)
+        if user is None or not user.is_active:
+            return None, [], version
+        targets = await crud_bot.get_external_bot_targets_async(db, tenant_id=user.tenant_id, bot_id=bot_id)
+    return user, targets, version
+
+
+async def _until_disconnect(websocket: WebSocket):
+    # Clients don't send anything; reading is only how a disconnect is noticed
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+async def forward_bot_updates(websocket: WebSocket, subscriber: BotStreamSubscriber):
+    """
+    Send the subscriber's bot updates to the socket until the client disconnects
+    """
+    async def forward():
+        while True:
+            for message in await subscriber.next_messages():
+                await websocket.send_text(message)
+
+    sender = asyncio.create_task(forward())
+    receiver = asyncio.create_task(_until_disconnect(websocket))
+    try:
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        sender.cancel()
+        receiver.cancel()
+
+
 @router.websocket("/ws/{token}")
 async def websocket_endpoint(websocket: WebSocket, token: str):
     """
-    WebSocket endpoint for real-time bot monitoring
+    WebSocket endpoint for real-time monitoring of all external bots of the user's tenant
     Token should be the user's JWT token for authentication
     """
+    user, targets, version = await authorize_websocket(token)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    tenant_id = user.tenant_id
+    subscriber = BotStreamSubscriber()
+
+    await manager.connect(websocket, tenant_id)
     try:
-        # Verify token and get user
-        # TODO: Implement proper JWT token verification for WebSocket
-        # For now, we'll use a simple approach
-        
-        # Mock user verification - replace with actual JWT verification
-        tenant_id = f"tenant_{token}"  # Temporary implementation
-        
-        await manager.connect(websocket, tenant_id)
-        
         # Send initial connection confirmation
         await manager.send_personal_message(
             json.dumps({
                 "type": "connection",
                 "status": "connected",
                 "message": "WebSocket connection established",
-                "tenant_id": tenant_id
-            }), 
+                "tenant_id": tenant_id,
+                "bot_ids": [target.bot_id for target in targets]
+            }),
             websocket
         )
-        
-        # Start monitoring loop
-        await monitor_bots_for_tenant(websocket, tenant_id)
-        
+
+        # One status_update message per bot, from the bot's shared poller
+        for target in targets:
+            bot_stream_hub.subscribe(subscriber, target, version)
+        await forward_bot_updates(websocket, subscriber)
+
     except WebSocketDisconnect:
-        manager.disconnect(websocket, tenant_id)
         logger.info(f"WebSocket disconnected for tenant: {tenant_id}")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
         await websocket.close()
-
-async def monitor_bots_for_tenant(websocket: WebSocket, tenant_id: str):
-    """
-    Continuously monitor bots for a specific tenant and send updates
-    """
-    orchestrator = FreqtradeOrchestrator()
-    
-    while True:
-        try:
-            # TODO: Get bots from database for this tenant
-            # For now, send mock data
-            bot_status_update = {
-                "type": "bot_status_update",
-                "timestamp": asyncio.get_event_loop().time(),
-                "data": {
-                    "active_bots": 0,
-                    "total_profit": 0.0,
-                    "running_bots": [],
-                    "message": "Real-time monitoring active"
-                }
-            }
-            
-            await manager.send_personal_message(
-                json.dumps(bot_status_update),
-                websocket
-            )
-            
-            # Wait 5 seconds before next update
-            await asyncio.sleep(5)
-            
-        except WebSocketDisconnect:
-            break
-        except Exception as e:
-            logger.error(f"Error in monitoring loop: {e}")
-            break
+    finally:
+        bot_stream_hub.unsubscribe(subscriber)
+        manager.disconnect(websocket, tenant_id)
 
 @router.websocket("/ws/bot/{bot_id}/{token}")
 async def bot_specific_websocket(websocket: WebSocket, bot_id: str, token: str):
     """
-    WebSocket endpoint for monitoring a specific bot
+    WebSocket endpoint for monitoring a specific external bot
     """
+    user, targets, version = await authorize_websocket(token, bot_id=bot_id)
+    if user is None or not targets:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    subscriber = BotStreamSubscriber()
+
+    await websocket.accept()
+    websocket_connections.inc("bot")
     try:
-        tenant_id = f"tenant_{token}"  # Temporary implementation
-        
-        await websocket.accept()
-        
         await websocket.send_text(json.dumps({
             "type": "bot_connection",
             "bot_id": bot_id,
             "status": "connected",
             "message": f"Monitoring bot {bot_id}"
         }))
-        
-        # Monitor specific bot
-        await monitor_specific_bot(websocket, bot_id, tenant_id)
-        
+
+        bot_stream_hub.subscribe(subscriber, targets[0], version)
+        await forward_bot_updates(websocket, subscriber)
+
     except WebSocketDisconnect:
         logger.info(f"Bot-specific WebSocket disconnected for bot: {bot_id}")
     except Exception as e:
         logger.error(f"Bot WebSocket error: {e}")
         await websocket.close()
-
-async def monitor_specific_bot(websocket: WebSocket, bot_id: str, tenant_id: str):
-    """
-    Monitor a specific bot and send real-time updates
-    """
-    orchestrator = FreqtradeOrchestrator()
-    
-    while True:
-        try:
-            # Get bot status from orchestrator
-            # TODO: Replace with actual orchestrator call when enabled
-            bot_update = {
-                "type": "bot_update",
-                "bot_id": bot_id,
-                "timestamp": asyncio.get_event_loop().time(),
-                "data": {
-                    "status": "running",
-                    "last_trade": None,
-                    "current_balance": 1000.0,
-                    "open_trades": 0,
-                    "profit_today": 0.0,
-                    "message": "Bot monitoring active"
-                }
-            }
-            
-            await websocket.send_text(json.dumps(bot_update))
-            
-            # Send logs update
-            logs_update = {
-                "type": "logs_update",
-                "bot_id": bot_id,
-                "timestamp": asyncio.get_event_loop().time(),
-                "data": {
-                    "logs": f"[{asyncio.get_event_loop().time()}] Bot {bot_id} is running normally...",
-                    "log_level": "info"
-                }
-            }
-            
-            await websocket.send_text(json.dumps(logs_update))
-            
-            await asyncio.sleep(3)  # Update every 3 seconds for specific bot
-            
-        except WebSocketDisconnect:
-            break
-        except Exception as e:
-            logger.error(f"Error monitoring bot {bot_id}: {e}")
-            break
\ No newline at end of file
+    finally:
+        bot_stream_hub.unsubscribe(subscriber)
+        websocket_connections.dec("bot")
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    In-process, size-bounded LRU cache with per-entry expiry and hit/miss counters.
+
+    Entries are evicted least-recently-used first once max_entries is reached,
+    and are dropped on access once their TTL has passed.
+    """
+
+    def __init__(self, max_entries: int, default_ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        # key -> (value, stored_at, expires_at)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key: Hashable, fresh_ttl: Optional[float] = None) -> Tuple[Optional[Any], bool]:
+        """
+        Returns (value, is_fresh). value is None on a miss.
+        When fresh_ttl is given, a live entry older than fresh_ttl is returned
+        with is_fresh=False so the caller can serve it while revalidating.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            value, stored_at, expires_at = entry
+            if expires_at is not None and now >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if fresh_ttl is not None and now - stored_at > fresh_ttl:
+                self.stale_hits += 1
+                return value, False
+            self.hits += 1
+            return value, True
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value, or None if missing or expired"""
+        return self.lookup(key)[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (value, now, now + ttl if ttl is not None else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
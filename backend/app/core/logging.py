@@ -1,87 +1,407 @@
+import atexit
+import copy
 import json
 import logging
+import queue
+import random
 import sys
+import threading
+import time
 import traceback
-from datetime import datetime
-from typing import Any, Dict, Optional
+from datetime import date, datetime, time as dt_time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional, TextIO, Tuple
 
-from pythonjsonlogger import jsonlogger
+try:
+    import orjson
+except ImportError:  # Optional speed-up, the stdlib json module is used without it
+    orjson = None
 
+from app.core.config import ENVIRONMENT, LOG_QUEUE_ENABLED, LOG_QUEUE_SIZE
 
-class DatadogJSONFormatter(jsonlogger.JsonFormatter):
-    """Custom JSON formatter optimized for Datadog ingestion"""
-    
-    def add_fields(self, log_record: Dict[str, Any], record: logging.LogRecord, message_dict: Dict[str, Any]) -> None:
-        super().add_fields(log_record, record, message_dict)
-        
-        # Add timestamp in ISO format
-        log_record['timestamp'] = datetime.utcnow().isoformat() + 'Z'
-        
-        # Add standard fields for Datadog
-        log_record['level'] = record.levelname
-        log_record['logger_name'] = record.name
-        log_record['service'] = 'tradewise-backend'
-        log_record['environment'] = 'development'  # TODO: Make configurable
-        
-        # Add process/thread info
-        log_record['process_id'] = record.process
-        log_record['thread_id'] = record.thread
-        
-        # Add source location
-        log_record['source'] = {
-            'file': record.pathname,
-            'line': record.lineno,
-            'function': record.funcName
+
+# Attributes every LogRecord has; everything else on a record came from `extra`
+_RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    return str(value)
+
+
+if orjson is not None:
+    def _dumps(payload: Dict[str, Any]) -> str:
+        try:
+            return orjson.dumps(payload, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits
+            return json.dumps(payload, default=_json_default, separators=(",", ":"))
+else:
+    def _dumps(payload: Dict[str, Any]) -> str:
+        return json.dumps(payload, default=_json_default, separators=(",", ":"))
+
+
+class DatadogJSONFormatter(logging.Formatter):
+    """
+    JSON formatter optimized for Datadog ingestion.
+
+    Service and environment are fixed per process and built once, the
+    timestamp is derived from record.created (the date/time part is cached
+    per second) and the traceback is only formatted for records with
+    exc_info. Serialised with orjson when it is installed.
+    """
+
+    def __init__(self, service: str = "tradewise-backend", environment: str = ENVIRONMENT):
+        super().__init__()
+        self._static_fields = {"service": service, "environment": environment}
+        self._second: Optional[int] = None
+        self._second_prefix = ""
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        if second != self._second:
+            self._second_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second = second
+        return f"{self._second_prefix}.{int((created - second) * 1_000_000):06d}Z"
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_record: Dict[str, Any] = {
+            "timestamp": self._timestamp(record.created),
+            "level": record.levelname,
+            "logger_name": record.name,
+            "message": record.getMessage(),
         }
-        
-        # Handle exceptions
+
+        exception = None
         if record.exc_info:
-            log_record['exception'] = {
-                'type': record.exc_info[0].__name__ if record.exc_info[0] else None,
-                'message': str(record.exc_info[1]) if record.exc_info[1] else None,
-                'traceback': traceback.format_exception(*record.exc_info)
+            exc_type, exc_value, _ = record.exc_info
+            lines = traceback.format_exception(*record.exc_info)
+            if not record.exc_text:
+                record.exc_text = "".join(lines).rstrip("\n")
+            log_record["exc_info"] = record.exc_text
+            exception = {
+                "type": exc_type.__name__ if exc_type else None,
+                "message": str(exc_value) if exc_value else None,
+                "traceback": lines,
             }
+        if record.stack_info:
+            log_record["stack_info"] = record.stack_info
+
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                log_record[key] = value
 
+        log_record.update(self._static_fields)
+        log_record["process_id"] = record.process
+        log_record["thread_id"] = record.thread
+        log_record["source"] = {
+            "file": record.pathname,
+            "line": record.lineno,
+            "function": record.funcName,
+        }
+        if exception is not None:
+            log_record["exception"] = exception
+        return _dumps(log_record)
 
-def setup_logging(log_level: str = "INFO") -> None:
+
+# Volume control for high-frequency events, by event_type.
+# LOG_SAMPLE_RATES: fraction of records kept, chosen at random.
+# LOG_RATE_LIMITS: at most `count` records per `window` seconds per (event_type, api_url).
+# A record has to pass both. ERROR and above and security_* events always pass.
+LOG_SAMPLE_RATES: Dict[str, float] = {
+    "external_api_call": 0.1,
+    "bot_connection_test_start": 0.1,
+    "bot_connection_test_success": 0.1,
+}
+LOG_RATE_LIMITS: Dict[str, Tuple[int, float]] = {
+    "external_api_call": (6, 60.0),
+    "bot_connection_test_start": (1, 60.0),
+    "bot_connection_test_success": (1, 60.0),
+    "bot_connection_test_partial_failure": (1, 60.0),
+    "bot_connection_test_failure": (1, 60.0),
+    "bot_connection_test_timeout": (1, 60.0),
+    "bot_connection_test_connection_error": (1, 60.0),
+}
+# Suppressed record counts are logged (as log_records_suppressed) at most this often
+LOG_SUPPRESSION_REPORT_INTERVAL = 60.0
+
+
+class EventSamplingFilter(logging.Filter):
+    """
+    Drops part of the records of high-frequency event types.
+
+    Sampling keeps a random share of the records of an event type (random
+    rather than every Nth, which would keep picking the same bots from a
+    fixed polling order). Rate limits use a fixed window per
+    (event_type, api_url), so one noisy bot can't crowd out the others. Dropped
+    records are counted per event type and reported by a
+    log_records_suppressed record once per report interval. The report is
+    written by the first record after the interval or, when no record comes,
+    by a background thread (start_reporting); stop_reporting writes out what
+    is left, so suppressed counts are never lost at shutdown.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Dict[str, float] = LOG_SAMPLE_RATES,
+        rate_limits: Dict[str, Tuple[int, float]] = LOG_RATE_LIMITS,
+        report_interval: float = LOG_SUPPRESSION_REPORT_INTERVAL,
+    ):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.rate_limits = rate_limits
+        self.report_interval = report_interval
+        self.suppressed_total = 0
+        self._lock = threading.Lock()
+        # (event_type, api_url) -> [window start, records passed in the window]
+        self._windows: Dict[Tuple[str, Optional[str]], List[float]] = {}
+        # event_type -> {"sampled": n, "rate_limited": n} since the last report
+        self._suppressed: Dict[str, Dict[str, int]] = {}
+        self._last_report = time.monotonic()
+        self._reporter: Optional[threading.Thread] = None
+        self._reporter_stop = threading.Event()
+
+    def start_reporting(self) -> None:
+        """Report suppressed counts from a daemon thread, even while nothing else is logged"""
+        if self._reporter is not None:
+            return
+        self._reporter_stop.clear()
+        self._reporter = threading.Thread(target=self._report_loop, name="log-suppression-reporter", daemon=True)
+        self._reporter.start()
+
+    def stop_reporting(self) -> None:
+        """Stop the reporter thread and report everything suppressed since the last report"""
+        if self._reporter is not None:
+            self._reporter_stop.set()
+            self._reporter.join()
+            self._reporter = None
+        self._report(time.monotonic(), force=True)
+
+    def _report_loop(self) -> None:
+        while not self._reporter_stop.wait(self.report_interval):
+            self._report(time.monotonic())
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        now = time.monotonic()
+        if now - self._last_report >= self.report_interval:
+            self._report(now)
+
+        event_type = getattr(record, "event_type", None)
+        if event_type is None or record.levelno >= logging.ERROR or event_type.startswith("security_"):
+            return True
+        rate = self.sample_rates.get(event_type)
+        limit = self.rate_limits.get(event_type)
+        if rate is None and limit is None:
+            return True
+
+        with self._lock:
+            if rate is not None and random.random() >= rate:
+                return self._suppress(event_type, "sampled")
+            if limit is not None:
+                count, window = limit
+                key = (event_type, getattr(record, "api_url", None))
+                state = self._windows.get(key)
+                if state is None or now - state[0] >= window:
+                    state = self._windows[key] = [now, 0]
+                if state[1] >= count:
+                    return self._suppress(event_type, "rate_limited")
+                state[1] += 1
+        return True
+
+    def _suppress(self, event_type: str, reason: str) -> bool:
+        counts = self._suppressed.setdefault(event_type, {"sampled": 0, "rate_limited": 0})
+        counts[reason] += 1
+        self.suppressed_total += 1
+        return False
+
+    def _report(self, now: float, force: bool = False) -> None:
+        with self._lock:
+            if not force and now - self._last_report < self.report_interval:
+                return
+            interval = now - self._last_report
+            self._last_report = now
+            suppressed, self._suppressed = self._suppressed, {}
+            # Forget windows that have run out
+            self._windows = {
+                key: state for key, state in self._windows.items()
+                if now - state[0] < self.rate_limits[key[0]][1]
+            }
+        if suppressed:
+            logging.getLogger("app.logging").info(
+                "Log records suppressed",
+                extra={
+                    "event_type": "log_records_suppressed",
+                    "interval_seconds": round(interval, 1),
+                    "suppressed": suppressed,
+                },
+            )
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded in-process queue.
+
+    Logging calls only copy the record onto the queue; a QueueListener thread
+    formats and writes it. When the queue is full the record is dropped and
+    counted instead of blocking the caller, so a slow stdout consumer (log
+    shipper) never stalls the event loop.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._drop_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message now, since args may change before the listener gets to
+        # it. Unlike the stdlib version exc_info is kept: the record never leaves the
+        # process and the JSON formatter builds the exception fields from it.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+# Loggers that get the application handler and don't propagate
+_CONFIGURED_LOGGERS = [
+    'app',
+    'uvicorn',
+    'uvicorn.access',
+    'uvicorn.error',
+    'sqlalchemy.engine',
+    'fastapi'
+]
+
+_handler: Optional[logging.Handler] = None  # Handler installed by setup_logging
+_sampling_filter: Optional[EventSamplingFilter] = None
+_queue_handler: Optional[BoundedQueueHandler] = None
+_queue_listener: Optional["LogQueueListener"] = None
+
+
+class LogQueueListener(QueueListener):
+    """QueueListener that waits for room for its stop sentinel in a full bounded queue"""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+def _swap_handler(old: Optional[logging.Handler], new: Optional[logging.Handler]) -> None:
+    for logger_name in [None, *_CONFIGURED_LOGGERS]:
+        logger = logging.getLogger(logger_name)
+        if old is not None and old in logger.handlers:
+            logger.removeHandler(old)
+            if new is not None:
+                logger.addHandler(new)
+
+
+def setup_logging(
+    log_level: str = "INFO",
+    use_queue: bool = LOG_QUEUE_ENABLED,
+    stream: Optional[TextIO] = None,
+) -> None:
     """Setup JSON logging for the application"""
+    global _handler, _queue_handler, _queue_listener, _sampling_filter
     
     # Create JSON formatter
-    formatter = DatadogJSONFormatter(
-        fmt='%(timestamp)s %(level)s %(logger_name)s %(message)s'
-    )
+    formatter = DatadogJSONFormatter()
     
     # Setup console handler
-    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler = logging.StreamHandler(stream or sys.stdout)
     console_handler.setFormatter(formatter)
+
+    # Replace what an earlier call installed
+    stop_logging()
+    _swap_handler(_handler, None)
+
+    handler: logging.Handler = console_handler
+    if use_queue:
+        # Loggers only enqueue; the listener thread formats and writes
+        _queue_handler = BoundedQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+        _queue_listener = LogQueueListener(_queue_handler.queue, console_handler, respect_handler_level=True)
+        _queue_listener.start()
+        handler = _queue_handler
+    # Filter where records enter the pipeline, before they are queued
+    _sampling_filter = EventSamplingFilter()
+    _sampling_filter.start_reporting()
+    handler.addFilter(_sampling_filter)
+    _handler = handler
     
     # Setup root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level.upper()))
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(handler)
     
     # Prevent duplicate logs
     root_logger.propagate = False
     
     # Setup specific loggers
-    loggers = [
-        'app',
-        'uvicorn',
-        'uvicorn.access',
-        'uvicorn.error',
-        'sqlalchemy.engine',
-        'fastapi'
-    ]
-    
-    for logger_name in loggers:
+    for logger_name in _CONFIGURED_LOGGERS:
         logger = logging.getLogger(logger_name)
         logger.setLevel(getattr(logging, log_level.upper()))
         if not logger.handlers:
-            logger.addHandler(console_handler)
+            logger.addHandler(handler)
         logger.propagate = False
     
     # Disable uvicorn access logs since we have our own middleware
     logging.getLogger("uvicorn.access").disabled = True
+    # httpx logs every request at INFO; upstream calls are logged by the bot manager
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def stop_logging() -> None:
+    """
+    Report suppressed record counts, then write out queued log records and
+    stop the listener thread, if any. Loggers then write directly to the
+    console handler.
+    """
+    global _handler, _queue_handler, _queue_listener
+    if _sampling_filter is not None:
+        _sampling_filter.stop_reporting()
+    if _queue_listener is None:
+        return
+    _queue_listener.stop()
+    console_handler = _queue_listener.handlers[0]
+    for log_filter in _queue_handler.filters:
+        console_handler.addFilter(log_filter)
+    _swap_handler(_queue_handler, console_handler)
+    if _queue_handler.dropped:
+        logging.getLogger("app.logging").warning(
+            "Log records were dropped",
+            extra={"event_type": "log_records_dropped", "dropped": _queue_handler.dropped},
+        )
+    _handler = console_handler
+    _queue_handler = None
+    _queue_listener = None
+
+
+atexit.register(stop_logging)
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """Queue depth, dropped and suppressed record counts of the logging pipeline"""
+    stats: Dict[str, Any] = {
+        "suppressed": _sampling_filter.suppressed_total if _sampling_filter is not None else 0,
+    }
+    if _queue_handler is None or _queue_listener is None:
+        return {**stats, "queue_enabled": False}
+    return {
+        **stats,
+        "queue_enabled": True,
+        "queued": _queue_handler.queue.qsize(),
+        "capacity": _queue_handler.queue.maxsize,
+        "dropped": _queue_handler.dropped,
+    }
 
 
 def get_logger(name: str) -> logging.Logger:
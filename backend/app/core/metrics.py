@@ -0,0 +1,250 @@
+"""
+Process-local metrics, exposed in the Prometheus text format by GET /metrics.
+
+Counters, gauges and histograms are recorded on hot paths (every request,
+upstream call and database query), so recording takes no lock: every thread
+writes to its own shard and shards are only summed when the metrics are
+rendered. Values derived from state that is tracked elsewhere (cache
+counters, pool occupancy) are registered as sampled metrics and read at
+render time.
+
+Every worker process has its own registry; Prometheus scrapes each worker,
+or the values are summed over workers in queries.
+"""
+import bisect
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[LabelValues, object]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[LabelValues, object]:
+        """This thread's shard; only this thread ever writes to it"""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def _shard_items(self):
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # dict() copies atomically under the GIL while the owner keeps writing
+            yield from dict(shard).items()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set"""
+
+    type_name = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        shard = self._shard()
+        shard[labelvalues] = shard.get(labelvalues, 0.0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        totals: Dict[LabelValues, float] = {}
+        for labelvalues, value in self._shard_items():
+            totals[labelvalues] = totals.get(labelvalues, 0.0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labelvalues, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that goes up and down, e.g. open connections"""
+
+    type_name = "gauge"
+
+    def dec(self, *labelvalues: str, amount: float = 1.0) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, plus their sum and count"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        shard = self._shard()
+        # [count per bucket..., count above the last bucket, sum]
+        entry = shard.get(labelvalues)
+        if entry is None:
+            entry = shard[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect.bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def values(self) -> Dict[LabelValues, List[float]]:
+        totals: Dict[LabelValues, List[float]] = {}
+        for labelvalues, entry in self._shard_items():
+            total = totals.get(labelvalues)
+            if total is None:
+                totals[labelvalues] = list(entry)
+            else:
+                for i, value in enumerate(entry):
+                    total[i] += value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        bounds = [*self.buckets, float("inf")]
+        for labelvalues, entry in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, entry):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            labels = _labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_number(entry[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Sampled(_Metric):
+    """Values read from a callback at render time"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        read: Callable[[], Dict[LabelValues, float]],
+        type_name: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.read = read
+        self.type_name = type_name
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labelvalues, value in sorted(self.read().items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def sampled(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        read: Callable[[], Dict[LabelValues, float]],
+        type_name: str = "gauge",
+    ) -> Sampled:
+        return self._register(Sampled(name, documentation, labelnames, read, type_name))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+http_request_duration = metrics.histogram(
+    "tradewise_http_request_duration_seconds",
+    "API request latency by route template and status code",
+    ("method", "route", "status"),
+)
+upstream_request_duration = metrics.histogram(
+    "tradewise_upstream_request_duration_seconds",
+    "Latency of requests to external bot APIs by endpoint and outcome",
+    ("endpoint", "outcome"),
+)
+upstream_circuit_rejections = metrics.counter(
+    "tradewise_upstream_circuit_rejections_total",
+    "Requests to external bot APIs refused by an open circuit breaker",
+    ("endpoint",),
+)
+db_query_duration = metrics.histogram(
+    "tradewise_db_query_duration_seconds",
+    "Database statement execution time by engine and statement type",
+    ("engine", "operation"),
+    buckets=DB_QUERY_BUCKETS,
+)
+websocket_connections = metrics.gauge(
+    "tradewise_websocket_connections",
+    "Open WebSocket connections by endpoint",
+    ("endpoint",),
+)
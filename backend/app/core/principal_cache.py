@@ -0,0 +1,74 @@
+import hashlib
+import itertools
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import event
+
+from app.core.cache import TTLCache
+from app.core.config import AUTH_PRINCIPAL_CACHE_TTL, AUTH_PRINCIPAL_CACHE_MAX_ENTRIES
+from app.models import user as models_user
+
+
+class PrincipalCache:
+    """
+    Bounded TTL cache of authenticated users, keyed by a SHA-256 of the bearer
+    token (raw tokens are never kept as keys).
+
+    An entry lives for at most `ttl` seconds and never past the token's exp.
+    Every user has a version that is bumped when the user row is updated or
+    deleted through the ORM in this process; entries cached under an older
+    version are treated as misses. Changes made elsewhere (other workers,
+    plain SQL) are only seen once the entry expires, so `ttl` bounds how long
+    a deactivated user keeps authenticating there.
+
+    Cached users are detached instances and must be treated as read-only.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self._cache = TTLCache(max_entries=max_entries)
+        self._versions: Dict[int, int] = {}
+        self._version_counter = itertools.count(1)
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[models_user.User]:
+        entry = self._cache.get(self._key(token))
+        if entry is None:
+            return None
+        user, version = entry
+        if self._versions.get(user.id, 0) != version:
+            self._cache.delete(self._key(token))
+            return None
+        return user
+
+    def set(self, token: str, user: models_user.User, expires_at: Optional[datetime]) -> None:
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, (expires_at - datetime.now(timezone.utc)).total_seconds())
+        if ttl <= 0:
+            return
+        self._cache.set(self._key(token), (user, self._versions.get(user.id, 0)), ttl=ttl)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached principal of this user"""
+        self._versions[user_id] = next(self._version_counter)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+principal_cache = PrincipalCache(ttl=AUTH_PRINCIPAL_CACHE_TTL, max_entries=AUTH_PRINCIPAL_CACHE_MAX_ENTRIES)
+
+
+@event.listens_for(models_user.User, "after_update")
+@event.listens_for(models_user.User, "after_delete")
+def _invalidate_cached_principal(mapper, connection, target) -> None:
+    # Deactivation, email or tenant changes must not be served from the cache
+    principal_cache.invalidate_user(target.id)
@@ -37,7 +37,11 @@ def decode_access_token(token: str) -> Optional[TokenData]:
         email: Optional[str] = payload.get("sub")  # Assuming 'sub' contains the email
         if email is None:
             return None  # Or raise credential_exception if email is mandatory
-        return TokenData(email=email)
+        exp = payload.get("exp")
+        return TokenData(
+            email=email,
+            exp=datetime.fromtimestamp(exp, tz=timezone.utc) if exp is not None else None,
+        )
     except JWTError:
         # Could log the error here
         return None
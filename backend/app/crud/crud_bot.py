@@ -1,7 +1,14 @@
+import base64
+import binascii
+from sqlalchemy import bindparam, delete, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models import bot as models_bot  # Alias to avoid confusion
+from app.models import trade as models_trade
+from app.crud import crud_trade
 from app.schemas import freqtrade_config as schemas_ft  # For type hinting if needed
-from typing import Optional
+from typing import Optional, Tuple
+from datetime import datetime
 
 
 def get_bot(db: Session, bot_id: str, tenant_id: str) -> Optional[models_bot.Bot]:
@@ -12,16 +19,66 @@ def get_bot(db: Session, bot_id: str, tenant_id: str) -> Optional[models_bot.Bot
     )
 
 
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque pagination cursor pointing just after the given bot"""
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor. Raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid pagination cursor")
+
+
 def get_bots_by_tenant(
-    db: Session, tenant_id: str, skip: int = 0, limit: int = 100
-) -> list[models_bot.Bot]:
-    return (
-        db.query(models_bot.Bot)
-        .filter(models_bot.Bot.tenant_id == tenant_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    db: Session,
+    tenant_id: str,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    bot_type: Optional[str] = None,
+    skip: int = 0,
+) -> Tuple[list[models_bot.Bot], Optional[str]]:
+    """
+    Returns one page of a tenant's bots ordered by (created_at, id), and the
+    cursor for the next page (None on the last page).
+
+    Keyset pagination: the page starts right after the cursor row using the
+    (tenant_id, [bot_type,] created_at, id) indexes, so deep pages cost the
+    same as the first one. `skip` (an OFFSET, kept for older clients) only
+    applies without a cursor. Raises ValueError for an invalid cursor.
+    """
+    stmt = _bots_page_stmt(tenant_id, limit, cursor, bot_type, skip)
+    return _bots_page(db.execute(stmt).scalars().all(), limit)
+
+
+def _bots_page_stmt(
+    tenant_id: str, limit: int, cursor: Optional[str], bot_type: Optional[str], skip: int = 0
+):
+    stmt = select(models_bot.Bot).where(models_bot.Bot.tenant_id == tenant_id)
+    if bot_type is not None:
+        stmt = stmt.where(models_bot.Bot.bot_type == bot_type)
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(models_bot.Bot.created_at, models_bot.Bot.id)
+            > tuple_(bindparam("cursor_created_at", created_at, type_=models_bot.Bot.created_at.type), id)
+        )
+    elif skip:
+        stmt = stmt.offset(skip)
+    # Fetch one extra row to know whether another page exists
+    return stmt.order_by(models_bot.Bot.created_at, models_bot.Bot.id).limit(limit + 1)
+
+
+def _bots_page(db_bots: list, limit: int) -> Tuple[list, Optional[str]]:
+    if len(db_bots) <= limit:
+        return list(db_bots), None
+    db_bots = db_bots[:limit]
+    return db_bots, encode_cursor(db_bots[-1].created_at, db_bots[-1].id)
 
 
 def create_bot(db: Session, bot_data: dict, tenant_id: str) -> models_bot.Bot:
@@ -43,8 +100,7 @@ def create_bot(db: Session, bot_data: dict, tenant_id: str) -> models_bot.Bot:
 
     db_bot = models_bot.Bot(**db_bot_data)
     db.add(db_bot)
-    db.commit()
-    db.refresh(db_bot)
+    db.commit()  # Server defaults come back in the INSERT (eager_defaults on Bot)
     return db_bot
 
 
@@ -56,42 +112,224 @@ def update_bot_status(
     container_id: Optional[str] = None,
     exposed_host_port: Optional[int] = None,
     connection_error: Optional[str] = None,
+    last_ping: Optional[datetime] = None,
+    db_bot: Optional[models_bot.Bot] = None,
 ) -> Optional[models_bot.Bot]:
-    db_bot = get_bot(db, bot_id=bot_id, tenant_id=tenant_id)  # Verify ownership
+    """
+    Pass db_bot when the caller already loaded (and ownership-checked) the
+    bot, to skip the lookup. The UPDATE returns updated_at, so the instance is
+    current afterwards without a reload.
+    """
+    if db_bot is None:
+        db_bot = get_bot(db, bot_id=bot_id, tenant_id=tenant_id)  # Verify ownership
     if db_bot:
         db_bot.status = status
         if container_id is not None:
             db_bot.container_id = container_id
         if exposed_host_port is not None:
             db_bot.exposed_host_port = exposed_host_port
-        if connection_error is not None:
+        if last_ping is not None:
+            # A successful contact replaces any previous connection error
+            db_bot.last_ping = last_ping
+            db_bot.connection_error = connection_error
+        elif connection_error is not None:
             db_bot.connection_error = connection_error
         db.commit()
-        db.refresh(db_bot)
     return db_bot
 
 
+# id, API URL, credentials and stored health of every external bot
+_EXTERNAL_BOT_TARGETS = select(
+    models_bot.Bot.id,
+    models_bot.Bot.bot_id,
+    models_bot.Bot.tenant_id,
+    models_bot.Bot.api_url,
+    models_bot.Bot.auth_method,
+    models_bot.Bot.api_token,
+    models_bot.Bot.username,
+    models_bot.Bot.password,
+    models_bot.Bot.status,
+    models_bot.Bot.connection_error,
+    models_bot.Bot.last_ping,
+).where(
+    models_bot.Bot.bot_type == "external",
+    models_bot.Bot.api_url.isnot(None),
+)
+
+
+def _external_bot_targets(tenant_id: Optional[str] = None, bot_id: Optional[str] = None):
+    stmt = _EXTERNAL_BOT_TARGETS
+    if tenant_id is not None:
+        stmt = stmt.where(models_bot.Bot.tenant_id == tenant_id)
+    if bot_id is not None:
+        stmt = stmt.where(models_bot.Bot.bot_id == bot_id)
+    return stmt
+
+
+def get_external_bot_targets(
+    db: Session, tenant_id: Optional[str] = None, bot_id: Optional[str] = None
+) -> list:
+    """
+    Returns the ids, API URL, credentials and stored health of every external bot
+    (optionally only a tenant's, or a single bot), for background jobs and live updates.
+    Only the needed columns are loaded.
+    """
+    return db.execute(_external_bot_targets(tenant_id, bot_id)).all()
+
+
+def update_bots_health(db: Session, health_updates: list[dict]) -> None:
+    """
+    Bulk-updates status/connection health columns in a single transaction.
+    Each dict must contain the bot primary key "id" plus the columns to set
+    (e.g. "status", "last_ping", "connection_error").
+    """
+    if not health_updates:
+        return
+    for stmt, params in _health_update_batches(health_updates):
+        db.execute(stmt, params)
+    db.commit()
+
+
+def _health_update_batches(health_updates: list[dict]):
+    """
+    Groups the updates by the set of columns they set, one executemany UPDATE
+    per group. Rows of bots deleted in the meantime are skipped silently.
+    """
+    table = models_bot.Bot.__table__
+    groups: dict = {}
+    for row in health_updates:
+        columns = tuple(sorted(column for column in row if column != "id"))
+        groups.setdefault(columns, []).append(row)
+    for columns, rows in groups.items():
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("bot_pk"))
+            .values({column: bindparam(f"new_{column}") for column in columns})
+        )
+        params = [
+            {"bot_pk": row["id"], **{f"new_{column}": row[column] for column in columns}}
+            for row in rows
+        ]
+        yield stmt, params
+
+
 def update_bot_paths(
     db: Session,
     bot_id: str,
     tenant_id: str,
     config_path: Optional[str] = None,
     user_data_path: Optional[str] = None,
+    db_bot: Optional[models_bot.Bot] = None,
 ) -> Optional[models_bot.Bot]:
-    db_bot = get_bot(db, bot_id=bot_id, tenant_id=tenant_id)  # Verify ownership
+    if db_bot is None:
+        db_bot = get_bot(db, bot_id=bot_id, tenant_id=tenant_id)  # Verify ownership
     if db_bot:
         if config_path:
             db_bot.config_path = config_path
         if user_data_path:
             db_bot.user_data_path = user_data_path
         db.commit()
-        db.refresh(db_bot)
     return db_bot
 
 
-def remove_bot(db: Session, bot_id: str, tenant_id: str) -> Optional[models_bot.Bot]:
-    db_bot = get_bot(db, bot_id=bot_id, tenant_id=tenant_id)  # Verify ownership
+def remove_bot(
+    db: Session, bot_id: str, tenant_id: str, db_bot: Optional[models_bot.Bot] = None
+) -> Optional[models_bot.Bot]:
+    if db_bot is None:
+        db_bot = get_bot(db, bot_id=bot_id, tenant_id=tenant_id)  # Verify ownership
     if db_bot:
+        crud_trade.delete_trades_for_bot(db, bot_id=bot_id)
         db.delete(db_bot)
         db.commit()
     return db_bot
+
+
+# Async variants, for code running on the event loop (AsyncSession from
+# app.db.session). They mirror the sync functions above.
+
+
+async def get_bot_async(db: AsyncSession, bot_id: str, tenant_id: str) -> Optional[models_bot.Bot]:
+    result = await db.execute(
+        select(models_bot.Bot)
+        .where(models_bot.Bot.bot_id == bot_id, models_bot.Bot.tenant_id == tenant_id)
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def get_bots_by_tenant_async(
+    db: AsyncSession,
+    tenant_id: str,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    bot_type: Optional[str] = None,
+    skip: int = 0,
+) -> Tuple[list[models_bot.Bot], Optional[str]]:
+    """See get_bots_by_tenant. Raises ValueError for an invalid cursor."""
+    stmt = _bots_page_stmt(tenant_id, limit, cursor, bot_type, skip)
+    result = await db.execute(stmt)
+    return _bots_page(result.scalars().all(), limit)
+
+
+async def create_bot_async(db: AsyncSession, bot_data: dict, tenant_id: str) -> models_bot.Bot:
+    db_bot_data = bot_data.copy()
+    db_bot_data["tenant_id"] = tenant_id
+    db_bot = models_bot.Bot(**db_bot_data)
+    db.add(db_bot)
+    await db.commit()
+    return db_bot
+
+
+async def update_bot_status_async(
+    db: AsyncSession,
+    bot_id: str,
+    tenant_id: str,
+    status: str,
+    container_id: Optional[str] = None,
+    exposed_host_port: Optional[int] = None,
+    connection_error: Optional[str] = None,
+    last_ping: Optional[datetime] = None,
+    db_bot: Optional[models_bot.Bot] = None,
+) -> Optional[models_bot.Bot]:
+    if db_bot is None:
+        db_bot = await get_bot_async(db, bot_id=bot_id, tenant_id=tenant_id)  # Verify ownership
+    if db_bot:
+        db_bot.status = status
+        if container_id is not None:
+            db_bot.container_id = container_id
+        if exposed_host_port is not None:
+            db_bot.exposed_host_port = exposed_host_port
+        if last_ping is not None:
+            db_bot.last_ping = last_ping
+            db_bot.connection_error = connection_error
+        elif connection_error is not None:
+            db_bot.connection_error = connection_error
+        await db.commit()
+    return db_bot
+
+
+async def get_external_bot_targets_async(
+    db: AsyncSession, tenant_id: Optional[str] = None, bot_id: Optional[str] = None
+) -> list:
+    result = await db.execute(_external_bot_targets(tenant_id, bot_id))
+    return result.all()
+
+
+async def update_bots_health_async(db: AsyncSession, health_updates: list[dict]) -> None:
+    if not health_updates:
+        return
+    for stmt, params in _health_update_batches(health_updates):
+        await db.execute(stmt, params)
+    await db.commit()
+
+
+async def remove_bot_async(
+    db: AsyncSession, bot_id: str, tenant_id: str, db_bot: Optional[models_bot.Bot] = None
+) -> Optional[models_bot.Bot]:
+    if db_bot is None:
+        db_bot = await get_bot_async(db, bot_id=bot_id, tenant_id=tenant_id)  # Verify ownership
+    if db_bot:
+        await db.execute(delete(models_trade.Trade).where(models_trade.Trade.bot_id == bot_id))
+        await db.delete(db_bot)
+        await db.commit()
+    return db_bot
@@ -0,0 +1,118 @@
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models import trade as models_trade
+from typing import Optional
+
+# Columns refreshed when an already-synced trade is seen again
+_UPSERT_COLUMNS = (
+    "pair",
+    "is_open",
+    "open_date",
+    "close_date",
+    "open_rate",
+    "close_rate",
+    "amount",
+    "stake_amount",
+    "profit_abs",
+    "profit_ratio",
+    "exit_reason",
+)
+
+
+def _count_trades_stmt(bot_id: str, max_trade_id: Optional[int]):
+    stmt = select(func.count(models_trade.Trade.id)).where(models_trade.Trade.bot_id == bot_id)
+    if max_trade_id is not None:
+        stmt = stmt.where(models_trade.Trade.trade_id <= max_trade_id)
+    return stmt
+
+
+def count_trades(db: Session, bot_id: str, max_trade_id: Optional[int] = None) -> int:
+    """Number of stored trades of a bot, optionally only those up to max_trade_id"""
+    return db.execute(_count_trades_stmt(bot_id, max_trade_id)).scalar()
+
+
+def get_max_trade_id(db: Session, bot_id: str) -> Optional[int]:
+    """Highest stored trade_id of a bot, None when nothing is stored"""
+    return db.execute(_max_trade_id_stmt(bot_id)).scalar()
+
+
+def _max_trade_id_stmt(bot_id: str):
+    return select(func.max(models_trade.Trade.trade_id)).where(models_trade.Trade.bot_id == bot_id)
+
+
+def get_trades(
+    db: Session, bot_id: str, limit: int = 50, before_trade_id: Optional[int] = None
+) -> list[models_trade.Trade]:
+    """
+    Returns a page of a bot's trades, newest first.
+    Pass the last trade_id of the previous page as before_trade_id to get the next one.
+    """
+    return db.execute(_trades_page_stmt(bot_id, limit, before_trade_id)).scalars().all()
+
+
+def _trades_page_stmt(bot_id: str, limit: int, before_trade_id: Optional[int]):
+    stmt = select(models_trade.Trade).where(models_trade.Trade.bot_id == bot_id)
+    if before_trade_id is not None:
+        stmt = stmt.where(models_trade.Trade.trade_id < before_trade_id)
+    return stmt.order_by(models_trade.Trade.trade_id.desc()).limit(limit)
+
+
+def upsert_trades(db: Session, trade_rows: list[dict]) -> int:
+    """
+    Inserts or updates trades in a single statement, keyed on (bot_id, trade_id).
+    Each row must contain bot_id, tenant_id and trade_id plus any trade columns.
+    """
+    if not trade_rows:
+        return 0
+    db.execute(_upsert_stmt(db.get_bind().dialect.name, trade_rows))
+    db.commit()
+    return len(trade_rows)
+
+
+def _upsert_stmt(dialect_name: str, trade_rows: list[dict]):
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(models_trade.Trade).values(trade_rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["bot_id", "trade_id"],
+        set_={
+            **{column: stmt.excluded[column] for column in _UPSERT_COLUMNS},
+            "synced_at": func.now(),
+        },
+    )
+
+
+def delete_trades_for_bot(db: Session, bot_id: str) -> None:
+    """Removes all synced trades of a bot (caller commits)"""
+    db.query(models_trade.Trade).filter(models_trade.Trade.bot_id == bot_id).delete(
+        synchronize_session=False
+    )
+
+
+# Async variants, for code running on the event loop
+
+
+async def count_trades_async(db: AsyncSession, bot_id: str, max_trade_id: Optional[int] = None) -> int:
+    result = await db.execute(_count_trades_stmt(bot_id, max_trade_id))
+    return result.scalar()
+
+
+async def get_max_trade_id_async(db: AsyncSession, bot_id: str) -> Optional[int]:
+    result = await db.execute(_max_trade_id_stmt(bot_id))
+    return result.scalar()
+
+
+async def get_trades_async(
+    db: AsyncSession, bot_id: str, limit: int = 50, before_trade_id: Optional[int] = None
+) -> list[models_trade.Trade]:
+    result = await db.execute(_trades_page_stmt(bot_id, limit, before_trade_id))
+    return result.scalars().all()
+
+
+async def upsert_trades_async(db: AsyncSession, trade_rows: list[dict]) -> int:
+    if not trade_rows:
+        return 0
+    await db.execute(_upsert_stmt(db.bind.dialect.name, trade_rows))
+    await db.commit()
+    return len(trade_rows)
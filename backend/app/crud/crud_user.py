@@ -1,8 +1,11 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.models import user as models_user  # Alias to avoid confusion
 from app.schemas import user as schemas_user
 from app.core.security import get_password_hash
+from app.services.password_hasher import password_hasher
 
 
 def get_user_by_email(db: Session, email: str) -> Optional[models_user.User]:
@@ -22,3 +25,27 @@ def create_user(db: Session, user: schemas_user.UserCreate) -> models_user.User:
     db.commit()
     db.refresh(db_user)
     return db_user
+
+
+# Async variants, for code running on the event loop
+
+
+async def get_user_by_email_async(db: AsyncSession, email: str) -> Optional[models_user.User]:
+    result = await db.execute(
+        select(models_user.User).where(models_user.User.email == email).limit(1)
+    )
+    return result.scalars().first()
+
+
+async def create_user_async(db: AsyncSession, user: schemas_user.UserCreate) -> models_user.User:
+    # bcrypt is CPU-bound; runs in the hashing process pool (may raise PasswordHasherBusy)
+    hashed_password = await password_hasher.hash(user.password)
+    db_user = models_user.User(
+        email=user.email,
+        hashed_password=hashed_password,
+        full_name=user.full_name,
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
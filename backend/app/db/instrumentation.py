@@ -0,0 +1,117 @@
+"""
+Statement instrumentation for the SQLAlchemy engines.
+
+Every statement is timed into the db_query_duration metric and, while a
+request is being handled, into that request's RequestQueryStats (found
+through a context variable set by RequestLoggingMiddleware), which ends up
+in the api_response log record. Slow statements are logged with their
+parameters reduced to type names, so no user data reaches the logs.
+"""
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import DB_REPEATED_QUERY_DETECTION, DB_REPEATED_QUERY_THRESHOLD, DB_SLOW_QUERY_MS
+from app.core.logging import get_logger
+from app.core.metrics import db_query_duration
+
+logger = get_logger("database")
+
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+_MAX_STATEMENT_LENGTH = 2000
+
+
+class RequestQueryStats:
+    """Statements executed while handling one request"""
+
+    def __init__(self, request_id: Optional[str] = None, track_statements: bool = DB_REPEATED_QUERY_DETECTION):
+        self.request_id = request_id
+        self.count = 0
+        self.duration = 0.0
+        # statement -> executions; only kept for repeated-statement detection
+        self.statements: Optional[Dict[str, int]] = {} if track_statements else None
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.duration += seconds
+        if self.statements is not None:
+            self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated(self, threshold: int = DB_REPEATED_QUERY_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statements executed more than threshold times, most frequent first"""
+        if not self.statements:
+            return []
+        return sorted(
+            ((statement, count) for statement, count in self.statements.items() if count > threshold),
+            key=lambda item: -item[1],
+        )
+
+
+request_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip()[:6].upper()
+    return keyword if keyword in _OPERATIONS else "OTHER"
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """Statement parameters with every value replaced by its type name"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def truncate_statement(statement: str) -> str:
+    statement = statement.strip()
+    if len(statement) > _MAX_STATEMENT_LENGTH:
+        return statement[:_MAX_STATEMENT_LENGTH] + "..."
+    return statement
+
+
+def _log_slow_query(name: str, statement: str, parameters: Any, executemany: bool, seconds: float) -> None:
+    stats = request_query_stats.get()
+    logger.warning(
+        "Slow database query",
+        extra={
+            "event_type": "db_slow_query",
+            "engine": name,
+            "operation": _operation(statement),
+            "duration_ms": seconds * 1000,
+            "statement": truncate_statement(statement),
+            "parameters": redact_parameters(parameters, executemany),
+            "request_id": stats.request_id if stats is not None else None,
+        },
+    )
+
+
+def instrument_engine(engine: Engine, name: str, slow_query_ms: float = DB_SLOW_QUERY_MS) -> None:
+    """Time every statement executed on a (sync) engine"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        db_query_duration.observe(elapsed, name, _operation(statement))
+        stats = request_query_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+        if elapsed * 1000 >= slow_query_ms:
+            _log_slow_query(name, statement, parameters, executemany, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # after_cursor_execute doesn't run for failed statements
+        starts = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+        if starts:
+            starts.pop()
@@ -1,18 +1,81 @@
+from typing import AsyncIterator, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from app.core.config import DATABASE_URL
+from app.core.config import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_ASYNC_POOL_SIZE,
+    DB_ASYNC_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+)
+from app.db.instrumentation import instrument_engine
+from app.db.pool import InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool
+
+IS_POSTGRES = DATABASE_URL.startswith("postgresql")
+
+# Shared by both engines; each engine sizes its own pool, see config
+POOL_SETTINGS = {
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
 
 # Configure engine based on database type
-if DATABASE_URL.startswith("postgresql"):
-    engine = create_engine(DATABASE_URL)
+if IS_POSTGRES:
+    engine = create_engine(
+        DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        **POOL_SETTINGS,
+    )
 else:
     # SQLite specific configuration
     engine = create_engine(
         DATABASE_URL,
         connect_args={"check_same_thread": False}
     )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay usable after commit, so updated rows are not reloaded just to build a response
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+def get_async_database_url(url: str, override: Optional[str] = None) -> str:
+    """Map a sync database URL onto the matching async driver"""
+    if override:
+        return override
+    scheme, _, rest = url.partition("://")
+    if scheme.startswith("postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+
+# Async engine for code running on the event loop (endpoints, background pollers).
+# Objects stay usable after commit so results can be returned without a reload.
+if IS_POSTGRES:
+    async_engine = create_async_engine(
+        get_async_database_url(DATABASE_URL, ASYNC_DATABASE_URL),
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=DB_ASYNC_POOL_SIZE,
+        max_overflow=DB_ASYNC_MAX_OVERFLOW,
+        **POOL_SETTINGS,
+    )
+else:
+    async_engine = create_async_engine(get_async_database_url(DATABASE_URL, ASYNC_DATABASE_URL))
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
 
 Base = declarative_base()
 
@@ -21,10 +84,10 @@ def init_db():
     # import all modules here that might define models so that
     # they will be registered properly on the metadata. Otherwise
     # you will have to import them first before calling init_db()
-    from app.models import bot, user  # Import models to register them
+    from app.models import bot, user, trade  # Import models to register them
 
     Base.metadata.create_all(bind=engine)
-    print("Database initialized with Bot and User tables.")
+    print("Database initialized with Bot, User and Trade tables.")
 
 
 def get_db():
@@ -33,3 +96,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
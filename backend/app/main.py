@@ -11,10 +11,18 @@ from app.api.endpoints import bots as bots_router  # Import the new bots router
 from app.api.endpoints import websocket as websocket_router  # Import WebSocket router
 from app.api.endpoints import external_bots as external_bots_router  # Import external bots router
 from app.api.endpoints import shared_bots as shared_bots_router  # Import shared bots router
+from app.api.endpoints import internal as internal_router  # Import internal metrics router
 
 # Import logging
-from app.core.logging import setup_logging, get_logger
+from app.core.logging import setup_logging, stop_logging, get_logger
 from app.middleware.logging import RequestLoggingMiddleware
+from app.services.external_bot_manager import external_bot_manager
+from app.services.bot_stream_hub import bot_stream_hub
+from app.services.health_poller import health_poller
+from app.services.trade_sync import trade_syncer
+from app.services.status_writer import bot_status_writer
+from app.services.password_hasher import password_hasher
+from app.core.config import BOT_HEALTH_POLL_ENABLED, TRADE_SYNC_ENABLED
 
 # Setup logging before anything else
 setup_logging()
@@ -36,15 +44,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods including OPTIONS
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["X-Next-Cursor"],  # Pagination cursor of list endpoints
 )
 
 
 # Initialize DB on startup
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     logger.info("Starting TradeWise API", extra={"event_type": "application_startup"})
     db_session.init_db()
     logger.info("Database initialized", extra={"event_type": "database_initialized"})
+    bot_status_writer.start()
+    password_hasher.start()
+    if BOT_HEALTH_POLL_ENABLED:
+        health_poller.start()
+    if TRADE_SYNC_ENABLED:
+        trade_syncer.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await health_poller.stop()
+    await bot_stream_hub.stop()
+    await trade_syncer.stop()
+    # Write buffered bot status updates before the engine goes away
+    await bot_status_writer.stop()
+    # Close pooled keep-alive connections to external bots
+    await external_bot_manager.aclose()
+    await db_session.async_engine.dispose()
+    password_hasher.shutdown()
+    logger.info("Stopping TradeWise API", extra={"event_type": "application_shutdown"})
+    stop_logging()
 
 
 # No global orchestrator instance here, it's instantiated within bots.py router or per-call if needed.
@@ -65,6 +95,12 @@ app.include_router(external_bots_router.router, prefix="/api/v1/external-bots",
 app.include_router(shared_bots_router.router, prefix="/api/v1/shared-bots", tags=["Shared Bots"])
 # Include WebSocket router
 app.include_router(websocket_router.router, prefix="/api/v1", tags=["WebSocket"])
+# Include internal metrics router (not part of the public API)
+app.include_router(
+    internal_router.router, prefix="/api/v1/internal", tags=["Internal"], include_in_schema=False
+)
+# Prometheus metrics at /metrics
+app.include_router(internal_router.metrics_router, tags=["Internal"], include_in_schema=False)
 
 
 # if __name__ == "__main__":
@@ -1,88 +1,166 @@
 import time
 import uuid
-from typing import Callable
+from typing import Any, Dict, Optional
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.logging import log_api_request, log_api_response, get_logger
+from app.core.metrics import http_request_duration
+from app.db.instrumentation import RequestQueryStats, request_query_stats, truncate_statement
 
 logger = get_logger("middleware")
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all API requests and responses in structured format"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Generate unique request ID
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    The matched route as a template, e.g. /api/v1/external-bots/{bot_id}/status,
+    to keep metric label values bounded. Rebuilt from the path and the matched
+    path parameters since route.path lacks the prefixes of included routers.
+    """
+    if "route" not in scope:
+        return "unmatched"
+    path_params = scope.get("path_params")
+    if not path_params:
+        return scope["path"]
+    names = {str(value): name for name, value in path_params.items()}
+    return "/".join(
+        f"{{{names[segment]}}}" if segment in names else segment
+        for segment in scope["path"].split("/")
+    )
+
+
+def _principal_ids(scope: Scope) -> Dict[str, Optional[str]]:
+    # request.state is backed by scope["state"]
+    user = scope.get("state", {}).get("user")
+    if user is None:
+        return {"user_id": None, "tenant_id": None}
+    return {"user_id": str(user.id), "tenant_id": user.tenant_id}
+
+
+class RequestLoggingMiddleware:
+    """
+    Logs every HTTP request and its response and tags the response with an
+    X-Request-ID header.
+
+    Implemented as a plain ASGI middleware: it only wraps `send`, so it adds no
+    extra task or queue per request and streaming responses are passed through
+    chunk by chunk. The response is logged once the last body chunk was sent,
+    so response_time_ms covers the full response, streamed bodies included.
+
+    Database statements run for the request are counted through a context
+    variable and reported as db_query_count and db_time_ms. With repeated
+    statement detection on, statements run more often than the threshold are
+    reported in a db_repeated_query warning.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
         request_id = str(uuid.uuid4())
-        
-        # Extract user info if available
-        user_id = None
-        tenant_id = None
-        if hasattr(request.state, "user"):
-            user_id = str(request.state.user.id)
-            tenant_id = request.state.user.tenant_id
-        
-        # Get client IP
-        client_ip = request.client.host if request.client else None
-        
-        # Log request
-        start_time = time.time()
-        
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        query_string = scope.get("query_string", b"")
+
         log_api_request(
-            method=request.method,
-            path=str(request.url.path),
-            user_id=user_id,
-            tenant_id=tenant_id,
+            method=method,
+            path=path,
             request_id=request_id,
-            client_ip=client_ip,
-            user_agent=request.headers.get("user-agent"),
-            query_params=dict(request.query_params) if request.query_params else None
+            client_ip=client[0] if client else None,
+            user_agent=_header(scope, b"user-agent"),
+            query_params=dict(QueryParams(query_string)) if query_string else None,
+            **_principal_ids(scope),
         )
-        
-        # Process request
-        try:
-            response = await call_next(request)
-            
-            # Calculate response time
-            process_time = (time.time() - start_time) * 1000
-            
-            # Log response
+
+        status_code = 500
+        response_started = False
+        logged = False
+        query_stats = RequestQueryStats(request_id)
+        query_stats_token = request_query_stats.set(query_stats)
+
+        def log_response() -> None:
+            nonlocal logged
+            logged = True
+            elapsed = time.perf_counter() - start_time
+            route = _route_template(scope)
+            http_request_duration.observe(elapsed, method, route, str(status_code))
             log_api_response(
-                method=request.method,
-                path=str(request.url.path),
-                status_code=response.status_code,
-                response_time_ms=process_time,
-                user_id=user_id,
-                tenant_id=tenant_id,
-                request_id=request_id
+                method=method,
+                path=path,
+                status_code=status_code,
+                response_time_ms=elapsed * 1000,
+                request_id=request_id,
+                db_query_count=query_stats.count,
+                db_time_ms=query_stats.duration * 1000,
+                **_principal_ids(scope),
             )
-            
-            # Add request ID to response headers for tracking
-            response.headers["X-Request-ID"] = request_id
-            
-            return response
-            
+            repeated = query_stats.repeated()
+            if repeated:
+                logger.warning(
+                    "Same statement executed repeatedly in one request",
+                    extra={
+                        "event_type": "db_repeated_query",
+                        "method": method,
+                        "path": path,
+                        "route": route,
+                        "request_id": request_id,
+                        "db_query_count": query_stats.count,
+                        "statements": [
+                            {"statement": truncate_statement(statement), "count": count}
+                            for statement, count in repeated
+                        ],
+                    },
+                )
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                await send(message)
+                log_response()
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            # Calculate response time for failed requests
-            process_time = (time.time() - start_time) * 1000
-            
-            # Log error response
-            logger.error(
-                f"Request failed: {str(e)}",
-                extra={
-                    "event_type": "api_error",
-                    "method": request.method,
-                    "path": str(request.url.path),
-                    "user_id": user_id,
-                    "tenant_id": tenant_id,
-                    "request_id": request_id,
-                    "response_time_ms": process_time,
-                    "error": str(e)
-                },
-                exc_info=True
-            )
-            
-            # Re-raise the exception to be handled by FastAPI
-            raise
\ No newline at end of file
+            elapsed = time.perf_counter() - start_time
+            if not logged:
+                http_request_duration.observe(elapsed, method, _route_template(scope), "500")
+            extra: Dict[str, Any] = {
+                "event_type": "api_error",
+                "method": method,
+                "path": path,
+                "request_id": request_id,
+                "response_time_ms": elapsed * 1000,
+                "response_started": response_started,
+                "db_query_count": query_stats.count,
+                "db_time_ms": query_stats.duration * 1000,
+                "error": str(e),
+                **_principal_ids(scope),
+            }
+            logger.error(f"Request failed: {e}", extra=extra, exc_info=True)
+            raise
+        finally:
+            request_query_stats.reset(query_stats_token)
+
+        if response_started and not logged:
+            # The client went away before the body was complete
+            log_response()
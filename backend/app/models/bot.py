@@ -1,10 +1,21 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Index
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 from app.db.session import Base
 
+# SQLite fills server defaults from CURRENT_TIMESTAMP, which has no fractional
+# seconds. Binding datetimes in the same text format keeps comparisons against
+# stored values (keyset pagination) exact within a second.
+_SQLITE_TIMESTAMP = sqlite.DATETIME(
+    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+)
+
 
 class Bot(Base):
     __tablename__ = "bots"
+    # Fetch server-generated created_at/updated_at with RETURNING in the
+    # INSERT/UPDATE itself instead of reloading the row afterwards
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     # bot_id is the unique identifier for the bot instance
@@ -50,10 +61,56 @@ class Bot(Base):
     last_ping = Column(DateTime(timezone=True), nullable=True)  # Last successful API ping
     connection_error = Column(Text, nullable=True)  # Last connection error message
 
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True).with_variant(_SQLITE_TIMESTAMP, "sqlite"), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True), default=func.now(), onupdate=func.now()
     )
 
     def __repr__(self):
         return f"<Bot(id={self.id}, bot_id='{self.bot_id}', tenant_id='{self.tenant_id}', status='{self.status}')>"
+
+
+# Composite/partial indexes for the hot query paths.
+# Existing databases get them through migrate_bot_indexes.py (CREATE INDEX CONCURRENTLY on PostgreSQL).
+
+# Tenant's bots of a type (external bot list, shared subscriptions) and the
+# per-tenant duplicate API URL check on connect
+Index(
+    "ix_bots_tenant_type_api_url",
+    Bot.tenant_id,
+    Bot.bot_type,
+    Bot.api_url,
+)
+
+# Keyset pagination of a tenant's bots, all types and per type
+Index(
+    "ix_bots_tenant_created",
+    Bot.tenant_id,
+    Bot.created_at,
+    Bot.id,
+)
+Index(
+    "ix_bots_tenant_type_created",
+    Bot.tenant_id,
+    Bot.bot_type,
+    Bot.created_at,
+    Bot.id,
+)
+
+# Public shared templates (marketplace)
+Index(
+    "ix_bots_public_shared",
+    Bot.bot_type,
+    Bot.is_public,
+    postgresql_where=Bot.is_public.is_(True),
+    sqlite_where=Bot.is_public.is_(True),
+)
+
+# Subscribers of a config template (marketplace counts, subscription check)
+Index(
+    "ix_bots_config_template_tenant",
+    Bot.config_template,
+    Bot.tenant_id,
+    postgresql_where=Bot.config_template.isnot(None),
+    sqlite_where=Bot.config_template.isnot(None),
+)
@@ -0,0 +1,49 @@
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Boolean,
+    Float,
+    ForeignKey,
+    UniqueConstraint,
+)
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class Trade(Base):
+    """Closed trade synced from a bot's /api/v1/trades endpoint"""
+
+    __tablename__ = "trades"
+    __table_args__ = (
+        # One row per upstream trade; also serves per-bot history ordered by trade_id
+        UniqueConstraint("bot_id", "trade_id", name="uq_trades_bot_trade"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    bot_id = Column(
+        String, ForeignKey("bots.bot_id", ondelete="CASCADE"), nullable=False
+    )
+    tenant_id = Column(String, index=True, nullable=False)
+
+    # Trade id as reported by the bot
+    trade_id = Column(Integer, nullable=False)
+    pair = Column(String, nullable=True)
+    is_open = Column(Boolean, nullable=False, default=False)
+    open_date = Column(DateTime(timezone=True), nullable=True)
+    close_date = Column(DateTime(timezone=True), nullable=True)
+    open_rate = Column(Float, nullable=True)
+    close_rate = Column(Float, nullable=True)
+    amount = Column(Float, nullable=True)
+    stake_amount = Column(Float, nullable=True)
+    profit_abs = Column(Float, nullable=True)
+    profit_ratio = Column(Float, nullable=True)
+    exit_reason = Column(String, nullable=True)
+
+    synced_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<Trade(bot_id='{self.bot_id}', trade_id={self.trade_id}, pair='{self.pair}')>"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl, validator
-from typing import Optional, Dict, Any, Literal
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 
 
@@ -151,6 +151,52 @@ class BotStatusResponse(BaseModel):
         }
 
 
+class FleetBotStatus(BaseModel):
+    """Live status of one bot within a fleet-wide status response"""
+    bot_id: str
+    name: Optional[str] = None
+    status: str  # 'running', 'error' or 'timeout'
+    timed_out: bool = False
+    message: str
+    connection_health: Optional[Dict[str, Any]] = None
+    bot_data: Optional[Dict[str, Any]] = None
+
+
+class FleetStatusResponse(BaseModel):
+    """Live status for all external bots of a tenant"""
+    total: int
+    timed_out: int
+    bots: List[FleetBotStatus]
+
+
+class TradeResponse(BaseModel):
+    """Trade synced from a bot"""
+    trade_id: int
+    pair: Optional[str] = None
+    is_open: bool
+    open_date: Optional[datetime] = None
+    close_date: Optional[datetime] = None
+    open_rate: Optional[float] = None
+    close_rate: Optional[float] = None
+    amount: Optional[float] = None
+    stake_amount: Optional[float] = None
+    profit_abs: Optional[float] = None
+    profit_ratio: Optional[float] = None
+    exit_reason: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class TradeHistoryResponse(BaseModel):
+    """Page of a bot's trade history, newest first"""
+    bot_id: str
+    trades: List[TradeResponse]
+    total_count: int
+    # Pass as `before` to fetch the next (older) page; null on the last page
+    next_before: Optional[int] = None
+
+
 class SharedBotMarketplace(BaseModel):
     """Schema for shared bot marketplace listing"""
     bot_id: str
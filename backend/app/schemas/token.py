@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
+from datetime import datetime
 
 
 class Token(BaseModel):
@@ -11,3 +12,4 @@ class TokenData(BaseModel):
     email: Optional[str] = (
         None  # 'sub' in JWT usually stores the user identifier (email in this case)
     )
+    exp: Optional[datetime] = None  # Token expiry ('exp' claim)
@@ -0,0 +1,161 @@
+"""
+Vectorised performance analytics over synced trade histories.
+
+Trades are loaded column-wise (only profit and close time) and every metric is
+computed with NumPy array operations, so histories with tens of thousands of
+trades are evaluated in milliseconds.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import bot as models_bot, trade as models_trade
+
+SECONDS_PER_DAY = 86400
+TRADING_DAYS_PER_YEAR = 365  # Crypto markets trade every day
+
+
+class TradeArrays(NamedTuple):
+    """Closed trades as parallel arrays, ordered by close time"""
+    profit_abs: np.ndarray
+    profit_ratio: np.ndarray
+    close_ts: np.ndarray  # Unix seconds
+
+
+def load_trade_arrays(db: Session, *filters) -> TradeArrays:
+    """Load closed trades matching the given Trade filters as column arrays"""
+    rows = db.execute(
+        select(
+            models_trade.Trade.profit_abs,
+            models_trade.Trade.profit_ratio,
+            models_trade.Trade.close_date,
+        )
+        .where(
+            models_trade.Trade.is_open.is_(False),
+            models_trade.Trade.close_date.isnot(None),
+            *filters,
+        )
+        .order_by(models_trade.Trade.close_date)
+    ).all()
+    if not rows:
+        return TradeArrays(np.empty(0), np.empty(0), np.empty(0))
+
+    profit_abs, profit_ratio, close_dates = zip(*rows)
+    return TradeArrays(
+        profit_abs=np.array(profit_abs, dtype=np.float64),
+        profit_ratio=np.array(profit_ratio, dtype=np.float64),
+        close_ts=np.fromiter(
+            (_as_utc(d).timestamp() for d in close_dates), dtype=np.float64, count=len(close_dates)
+        ),
+    )
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are stored as UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _none_if_nan(value: float) -> Optional[float]:
+    return None if not np.isfinite(value) else float(value)
+
+
+def _daily_returns(trades: TradeArrays) -> np.ndarray:
+    """Sum of profit ratios per calendar day, including days without closed trades"""
+    days = (trades.close_ts // SECONDS_PER_DAY).astype(np.int64)
+    return np.bincount(days - days[0], weights=trades.profit_ratio)
+
+
+def compute_performance(trades: TradeArrays) -> Dict[str, Any]:
+    """
+    Compute performance metrics for a trade history.
+
+    Returns cumulative PnL, win rate, average profit, profit factor, annualised
+    Sharpe and Sortino ratios (on daily returns), and the maximum drawdown with
+    its duration. Ratios that are undefined for the history are None.
+    """
+    total_trades = int(trades.profit_abs.size)
+    if total_trades == 0:
+        return {
+            "total_trades": 0,
+            "total_profit": 0.0,
+            "total_profit_ratio": 0.0,
+            "win_rate": 0.0,
+            "avg_profit": 0.0,
+            "avg_profit_ratio": 0.0,
+            "profit_factor": None,
+            "sharpe_ratio": None,
+            "sortino_ratio": None,
+            "max_drawdown": 0.0,
+            "max_drawdown_abs": 0.0,
+            "max_drawdown_duration_days": 0.0,
+        }
+
+    profit_abs = np.nan_to_num(trades.profit_abs)
+    profit_ratio = np.nan_to_num(trades.profit_ratio)
+
+    gross_profit = profit_abs[profit_abs > 0].sum()
+    gross_loss = -profit_abs[profit_abs < 0].sum()
+
+    daily = _daily_returns(TradeArrays(profit_abs, profit_ratio, trades.close_ts))
+    daily_mean = daily.mean()
+    daily_std = daily.std()
+    downside = np.minimum(daily, 0.0)
+    downside_std = np.sqrt(np.mean(downside ** 2))
+    annualisation = np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    # Drawdown on the cumulative profit curves
+    cumulative_abs = np.cumsum(profit_abs)
+    cumulative_ratio = np.cumsum(profit_ratio)
+    peak_abs = np.maximum.accumulate(np.concatenate(([0.0], cumulative_abs)))[1:]
+    peak_ratio = np.maximum.accumulate(np.concatenate(([0.0], cumulative_ratio)))[1:]
+    drawdown_abs = peak_abs - cumulative_abs
+
+    # Duration: time since the last new high, for every trade still below it
+    indices = np.arange(total_trades)
+    at_peak = cumulative_abs >= peak_abs
+    last_peak_index = np.maximum.accumulate(np.where(at_peak, indices, -1))
+    peak_ts = np.where(
+        last_peak_index >= 0, trades.close_ts[np.maximum(last_peak_index, 0)], trades.close_ts[0]
+    )
+    drawdown_seconds = np.where(at_peak, 0.0, trades.close_ts - peak_ts)
+
+    return {
+        "total_trades": total_trades,
+        "total_profit": float(cumulative_abs[-1]),
+        "total_profit_ratio": float(cumulative_ratio[-1]),
+        "win_rate": float(np.count_nonzero(profit_abs > 0) / total_trades),
+        "avg_profit": float(profit_abs.mean()),
+        "avg_profit_ratio": float(profit_ratio.mean()),
+        "profit_factor": _none_if_nan(gross_profit / gross_loss) if gross_loss > 0 else None,
+        "sharpe_ratio": _none_if_nan(daily_mean / daily_std * annualisation) if daily_std > 0 else None,
+        "sortino_ratio": _none_if_nan(daily_mean / downside_std * annualisation) if downside_std > 0 else None,
+        "max_drawdown": float((peak_ratio - cumulative_ratio).max()),
+        "max_drawdown_abs": float(drawdown_abs.max()),
+        "max_drawdown_duration_days": float(drawdown_seconds.max() / SECONDS_PER_DAY),
+    }
+
+
+def profit_ratio_since(trades: TradeArrays, since: datetime) -> float:
+    """Sum of profit ratios of trades closed at or after `since`"""
+    start = np.searchsorted(trades.close_ts, since.timestamp())
+    return float(np.nan_to_num(trades.profit_ratio[start:]).sum())
+
+
+def bot_performance(db: Session, bot_id: str) -> Dict[str, Any]:
+    return compute_performance(load_trade_arrays(db, models_trade.Trade.bot_id == bot_id))
+
+
+def tenant_performance(db: Session, tenant_id: str) -> Dict[str, Any]:
+    return compute_performance(load_trade_arrays(db, models_trade.Trade.tenant_id == tenant_id))
+
+
+def template_trade_arrays(db: Session, config_template: str) -> TradeArrays:
+    """Trades of every shared bot running the given config template"""
+    template_bots = select(models_bot.Bot.bot_id).where(
+        models_bot.Bot.config_template == config_template,
+        models_bot.Bot.bot_type == "shared",
+    )
+    return load_trade_arrays(db, models_trade.Trade.bot_id.in_(template_bots))
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from app.core.config import WS_BOT_POLL_INTERVAL
+from app.core.logging import get_logger
+from app.services.external_bot_manager import ExternalBotManager, external_bot_manager, normalize_bot_data
+from app.services.status_writer import BotStatusWriteBuffer, bot_status_writer
+
+logger = get_logger("bot_stream_hub")
+
+
+class BotStreamSubscriber:
+    """
+    One WebSocket's view of the bots it watches. Only the latest update of
+    each bot is kept until the socket picks it up, so a slow client skips
+    intermediate updates instead of holding up the poller or buffering
+    without bound.
+    """
+
+    def __init__(self):
+        self.bot_ids: Set[str] = set()
+        self._pending: Dict[str, str] = {}
+        self._ready = asyncio.Event()
+
+    def publish(self, bot_id: str, message: str) -> None:
+        self._pending[bot_id] = message
+        self._ready.set()
+
+    async def next_messages(self) -> List[str]:
+        """Wait for updates; returns the latest message of every bot updated since the last call"""
+        await self._ready.wait()
+        self._ready.clear()
+        messages = list(self._pending.values())
+        self._pending.clear()
+        return messages
+
+
+class _BotTopic:
+    def __init__(self, target):
+        self.target = target
+        self.subscribers: Set[BotStreamSubscriber] = set()
+        self.last_message: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class BotStreamHub:
+    """
+    In-process publish/subscribe hub for live bot updates over WebSocket.
+
+    Every watched bot has exactly one poller task, started when the first
+    socket subscribes to it and cancelled when the last one unsubscribes. The
+    poller fetches the bot's status every `interval` seconds, serialises the
+    update once and hands the same message to every subscriber, so upstream
+    calls grow with the number of watched bots, not with the number of open
+    sockets. New subscribers get the bot's last update right away. Results are
+    also persisted through the status write buffer, like the status endpoint.
+
+    Pollers are per worker process: a bot watched from sockets on several
+    workers is polled once per worker.
+    """
+
+    def __init__(
+        self,
+        manager: ExternalBotManager = external_bot_manager,
+        interval: float = WS_BOT_POLL_INTERVAL,
+        writer: BotStatusWriteBuffer = bot_status_writer,
+    ):
+        self.manager = manager
+        self.interval = interval
+        self.writer = writer
+        self._topics: Dict[str, _BotTopic] = {}
+        self.polls = 0
+        self.published = 0
+
+    def subscribe(self, subscriber: BotStreamSubscriber, target, version: int) -> None:
+        """
+        Subscribe to a bot's updates. `target` is a row from
+        crud_bot.get_external_bot_targets_async (bot ids, API URL, credentials
+        and stored health), loaded after the write buffer was at `version`.
+        Must be called on the event loop.
+        """
+        bot_id = target.bot_id
+        # Targets are only fresh at subscribe time; later polls compare
+        # against what the buffer writes (or is told was written) since
+        self.writer.seed(target, version)
+        topic = self._topics.get(bot_id)
+        if topic is None:
+            topic = self._topics[bot_id] = _BotTopic(target)
+            topic.task = asyncio.create_task(self._poll(topic))
+            logger.info(
+                "Bot stream poller started",
+                extra={"event_type": "bot_stream_started", "bot_id": bot_id, "interval_seconds": self.interval}
+            )
+        else:
+            # Freshly loaded, so changed credentials are picked up
+            topic.target = target
+            if topic.last_message is not None:
+                subscriber.publish(bot_id, topic.last_message)
+        topic.subscribers.add(subscriber)
+        subscriber.bot_ids.add(bot_id)
+
+    def unsubscribe(self, subscriber: BotStreamSubscriber) -> None:
+        """Drop all of a subscriber's subscriptions, stopping pollers nobody watches anymore"""
+        for bot_id in subscriber.bot_ids:
+            topic = self._topics.get(bot_id)
+            if topic is None:
+                continue
+            topic.subscribers.discard(subscriber)
+            if not topic.subscribers:
+                del self._topics[bot_id]
+                topic.task.cancel()
+                logger.info(
+                    "Bot stream poller stopped",
+                    extra={"event_type": "bot_stream_stopped", "bot_id": bot_id}
+                )
+        subscriber.bot_ids.clear()
+
+    async def stop(self) -> None:
+        """Cancel every poller and wait for them to finish"""
+        topics = list(self._topics.values())
+        self._topics.clear()
+        for topic in topics:
+            topic.task.cancel()
+        await asyncio.gather(*(topic.task for topic in topics), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "bots": len(self._topics),
+            "subscriptions": sum(len(topic.subscribers) for topic in self._topics.values()),
+            "polls": self.polls,
+            "published": self.published,
+        }
+
+    async def _poll(self, topic: _BotTopic) -> None:
+        while True:
+            cycle_start = time.monotonic()
+            try:
+                message = await self._fetch_update(topic.target)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "Bot stream poll failed",
+                    extra={"event_type": "bot_stream_error", "bot_id": topic.target.bot_id, "error": str(e)},
+                    exc_info=True
+                )
+            else:
+                topic.last_message = message
+                for subscriber in topic.subscribers:
+                    subscriber.publish(topic.target.bot_id, message)
+                self.published += len(topic.subscribers)
+            elapsed = time.monotonic() - cycle_start
+            await asyncio.sleep(max(self.interval - elapsed, 0))
+
+    async def _fetch_update(self, target) -> str:
+        """Fetch a bot's status and return it as a serialised status_update message"""
+        result = await self.manager.get_bot_status(
+            api_url=target.api_url,
+            auth_method=target.auth_method or "token",
+            api_token=target.api_token,
+            username=target.username,
+            password=target.password
+        )
+        self.polls += 1
+        now = datetime.now(timezone.utc)
+
+        if result["success"]:
+            self.writer.record(target.id, status="running", connection_error=None, last_ping=now)
+            update = {
+                "status": "running",
+                "message": "Bot is running normally",
+                "connection_health": {
+                    "last_ping": result["timestamp"],
+                    "success": True,
+                    "circuit": self.manager.get_circuit_state(target.api_url),
+                },
+                "data": normalize_bot_data(result["data"]),
+            }
+        else:
+            self.writer.record(target.id, status="error", connection_error=result["error"])
+            update = {
+                "status": "error",
+                "message": f"Connection failed: {result.get('message') or result['error']}",
+                "connection_health": {
+                    "success": False,
+                    "error": result["error"],
+                    "circuit": self.manager.get_circuit_state(target.api_url),
+                },
+                "data": None,
+            }
+
+        return json.dumps(
+            {"type": "status_update", "bot_id": target.bot_id, "timestamp": now.isoformat(), **update},
+            default=str,
+        )
+
+
+bot_stream_hub = BotStreamHub()
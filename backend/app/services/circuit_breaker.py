@@ -0,0 +1,85 @@
+import time
+from typing import Any, Dict, Optional
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an upstream whose circuit is open. The message
+    stays the same for as long as the circuit is open (it ends up as a stored
+    connection error); the time to the next trial call is in retry_in and in
+    CircuitBreaker.snapshot().
+    """
+
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {name}")
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single upstream.
+
+    closed    -- calls go through; consecutive failures are counted
+    open      -- calls fail immediately with CircuitOpenError until
+                 recovery_timeout has passed
+    half_open -- up to half_open_max_calls trial calls go through; a success
+                 closes the circuit, a failure opens it again
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._half_open_calls = 0
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call must not go through"""
+        if self.state == self.CLOSED:
+            return
+        if self.state == self.OPEN:
+            retry_in = self.opened_at + self.recovery_timeout - time.monotonic()
+            if retry_in > 0:
+                raise CircuitOpenError(self.name, retry_in)
+            self.state = self.HALF_OPEN
+            self._half_open_calls = 0
+        if self._half_open_calls >= self.half_open_max_calls:
+            raise CircuitOpenError(self.name, 0.0)
+        self._half_open_calls += 1
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._half_open_calls = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._half_open_calls = 0
+
+    def release(self) -> None:
+        """Give back a half-open trial slot for a call that ended without an outcome (e.g. cancelled)"""
+        if self.state == self.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state, for status endpoints"""
+        retry_in = None
+        if self.state == self.OPEN:
+            retry_in = max(self.opened_at + self.recovery_timeout - time.monotonic(), 0.0)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": retry_in,
+        }
@@ -1,24 +1,161 @@
-import requests
 import asyncio
+import hashlib
 import time
-from typing import Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 import base64
 
+import httpx
+
+from app.core.cache import TTLCache
+from app.core.config import (
+    EXTERNAL_BOT_CONNECT_TIMEOUT,
+    EXTERNAL_BOT_READ_TIMEOUT,
+    EXTERNAL_BOT_MAX_CONNECTIONS_PER_HOST,
+    EXTERNAL_BOT_KEEPALIVE_EXPIRY,
+    EXTERNAL_BOT_CACHE_TTLS,
+    EXTERNAL_BOT_CACHE_STALE_FACTOR,
+    EXTERNAL_BOT_CACHE_MAX_ENTRIES,
+    EXTERNAL_BOT_CIRCUIT_FAILURE_THRESHOLD,
+    EXTERNAL_BOT_CIRCUIT_RECOVERY_TIMEOUT,
+    EXTERNAL_BOT_CIRCUIT_HALF_OPEN_MAX_CALLS,
+    EXTERNAL_BOT_CONNECT_TIMEOUT_FLOOR,
+    EXTERNAL_BOT_CONNECT_TIMEOUT_CEILING,
+    EXTERNAL_BOT_READ_TIMEOUT_FLOOR,
+    EXTERNAL_BOT_READ_TIMEOUT_CEILING,
+    EXTERNAL_BOT_TIMEOUT_SAFETY_FACTOR,
+    EXTERNAL_BOT_LATENCY_EWMA_ALPHA,
+    EXTERNAL_BOT_LATENCY_WINDOW,
+    EXTERNAL_BOT_LATENCY_MIN_SAMPLES,
+    EXTERNAL_BOT_ENDPOINT_TIMEOUT_MULTIPLIERS,
+)
 from app.core.logging import get_logger, log_external_api_call
+from app.core.metrics import upstream_circuit_rejections, upstream_request_duration
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.latency_tracker import HostLatencyTracker
 
 logger = get_logger("external_bot_manager")
 
 
+def normalize_bot_data(bot_data) -> dict:
+    """Ensure live bot data is always a dictionary"""
+    if isinstance(bot_data, list):
+        # If the API returns a list (e.g., trades), wrap it in a dictionary
+        return {"trades": bot_data}
+    if not isinstance(bot_data, dict):
+        # If it's neither list nor dict, wrap it in a generic structure
+        return {"raw_data": bot_data}
+    return bot_data
+
+
 class ExternalBotManager:
     """
     Manages connections to external trading bot instances via their REST APIs
+
+    All calls are made with a native asyncio HTTP client. Each bot host gets its
+    own keep-alive connection pool, so a slow or dead bot can only exhaust its
+    own connections and never blocks the event loop.
+
+    Successful reads are cached per bot and endpoint (see EXTERNAL_BOT_CACHE_TTLS),
+    so upstream load scales with the number of bots rather than viewers, and
+    identical concurrent reads are coalesced into a single upstream request.
+
+    Each bot API URL has a circuit breaker: after repeated connection failures
+    calls fail immediately with a "circuit open" error instead of waiting for
+    the connect timeout.
+
+    Timeouts adapt per bot: each API URL keeps a rolling latency estimate that
+    sets its connect and read timeouts within the configured floor and ceiling.
     """
     
     def __init__(self):
-        self.session = requests.Session()
-        # Set both connect and read timeouts
-        self.timeout = (5, 10)  # (connect_timeout, read_timeout)
+        # Default connect and read timeouts, used until a bot has a latency estimate
+        self.timeout = (EXTERNAL_BOT_CONNECT_TIMEOUT, EXTERNAL_BOT_READ_TIMEOUT)  # (connect_timeout, read_timeout)
+        self.limits = httpx.Limits(
+            max_connections=EXTERNAL_BOT_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=EXTERNAL_BOT_MAX_CONNECTIONS_PER_HOST,
+            keepalive_expiry=EXTERNAL_BOT_KEEPALIVE_EXPIRY,
+        )
+        # One pooled client per bot host (scheme://host:port)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self.cache = TTLCache(max_entries=EXTERNAL_BOT_CACHE_MAX_ENTRIES)
+        # Cache keys with a background refresh in flight, and the refresh tasks themselves
+        self._refreshing: Set[Tuple] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        # Identical GETs currently in flight, shared by all concurrent callers
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self.coalesced_calls = 0
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, HostLatencyTracker] = {}
+    
+    def _get_client(self, api_url: str) -> httpx.AsyncClient:
+        """Return the pooled client for the host of api_url, creating it on first use"""
+        url = httpx.URL(api_url)
+        host_key = f"{url.scheme}://{url.netloc.decode('ascii')}"
+        client = self._clients.get(host_key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=httpx.Timeout(
+                    connect=self.timeout[0],
+                    read=self.timeout[1],
+                    write=self.timeout[1],
+                    pool=self.timeout[0],
+                ),
+            )
+            self._clients[host_key] = client
+        return client
+    
+    def _get_breaker(self, api_url: str) -> CircuitBreaker:
+        breaker = self._breakers.get(api_url)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                api_url,
+                failure_threshold=EXTERNAL_BOT_CIRCUIT_FAILURE_THRESHOLD,
+                recovery_timeout=EXTERNAL_BOT_CIRCUIT_RECOVERY_TIMEOUT,
+                half_open_max_calls=EXTERNAL_BOT_CIRCUIT_HALF_OPEN_MAX_CALLS,
+            )
+            self._breakers[api_url] = breaker
+        return breaker
+    
+    def _get_latency_tracker(self, api_url: str) -> HostLatencyTracker:
+        tracker = self._latency.get(api_url)
+        if tracker is None:
+            tracker = HostLatencyTracker(
+                default_timeout=self.timeout,
+                connect_bounds=(EXTERNAL_BOT_CONNECT_TIMEOUT_FLOOR, EXTERNAL_BOT_CONNECT_TIMEOUT_CEILING),
+                read_bounds=(EXTERNAL_BOT_READ_TIMEOUT_FLOOR, EXTERNAL_BOT_READ_TIMEOUT_CEILING),
+                endpoint_multipliers=EXTERNAL_BOT_ENDPOINT_TIMEOUT_MULTIPLIERS,
+                safety_factor=EXTERNAL_BOT_TIMEOUT_SAFETY_FACTOR,
+                alpha=EXTERNAL_BOT_LATENCY_EWMA_ALPHA,
+                window=EXTERNAL_BOT_LATENCY_WINDOW,
+                min_samples=EXTERNAL_BOT_LATENCY_MIN_SAMPLES,
+            )
+            self._latency[api_url] = tracker
+        return tracker
+    
+    def get_latency_state(self, api_url: str) -> Dict[str, Any]:
+        """Latency estimate and current timeouts for a bot API URL"""
+        return self._get_latency_tracker(api_url.rstrip('/')).snapshot()
+    
+    def get_circuit_state(self, api_url: str) -> Dict[str, Any]:
+        """Circuit breaker state for a bot API URL"""
+        return self._get_breaker(api_url.rstrip('/')).snapshot()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache and request-coalescing counters"""
+        return {
+            "cache": self.cache.stats(),
+            "coalesced_calls": self.coalesced_calls,
+            "inflight_calls": len(self._inflight),
+        }
+    
+    async def aclose(self) -> None:
+        """Close all pooled host clients"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
     
     def _get_auth_args(self, auth_method: str, api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict:
         """Helper method to prepare authentication arguments for method calls"""
@@ -29,7 +166,168 @@ class ExternalBotManager:
             "password": password
         }
     
-    def test_bot_connection(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict:
+    def _get_auth_headers(self, auth_method: str, api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict[str, str]:
+        """Build the Authorization header for the given auth method"""
+        headers = {}
+        if auth_method == "token":
+            headers['Authorization'] = f'Bearer {api_token}'
+        elif auth_method == "basic":
+            credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+            headers['Authorization'] = f'Basic {credentials}'
+        return headers
+    
+    async def _request(self, method: str, api_url: str, path: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None, bypass_circuit: bool = False) -> httpx.Response:
+        """
+        Send a request to a bot API through its host's connection pool.
+        
+        Raises CircuitOpenError without contacting the bot while its circuit is
+        open, unless bypass_circuit is set. Only connection-level failures
+        (timeouts, refused connections, ...) count against the circuit.
+        
+        Timeouts come from the bot's latency tracker; every completed or
+        timed-out request feeds back into it.
+        """
+        breaker = self._get_breaker(api_url)
+        if not bypass_circuit:
+            try:
+                breaker.before_call()
+            except CircuitOpenError:
+                upstream_circuit_rejections.inc(path)
+                raise
+        tracker = self._get_latency_tracker(api_url)
+        connect_timeout, read_timeout = tracker.timeouts_for(path)
+        timeout = httpx.Timeout(connect=connect_timeout, read=read_timeout, write=read_timeout, pool=connect_timeout)
+        client = self._get_client(api_url)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, f"{api_url}{path}", headers=headers, params=params, timeout=timeout)
+        except httpx.TimeoutException:
+            elapsed = time.perf_counter() - start
+            # Count the full wait so a bot that is slower than its estimate gets longer timeouts
+            tracker.observe(path, elapsed)
+            upstream_request_duration.observe(elapsed, path, "timeout")
+            breaker.record_failure()
+            raise
+        except httpx.TransportError:
+            upstream_request_duration.observe(time.perf_counter() - start, path, "transport_error")
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        elapsed = time.perf_counter() - start
+        tracker.observe(path, elapsed)
+        upstream_request_duration.observe(elapsed, path, "ok" if response.status_code < 400 else "http_error")
+        breaker.record_success()
+        return response
+    
+    def _cache_key(self, api_url: str, path: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None) -> Tuple:
+        """Cache key for a bot endpoint; includes a credential fingerprint so tenants never share entries"""
+        auth_fingerprint = hashlib.sha256(headers.get('Authorization', '').encode()).hexdigest()[:16]
+        return (api_url, auth_fingerprint, path, tuple(sorted((params or {}).items())))
+    
+    async def _fetch_json(self, api_url: str, path: str, headers: Dict[str, str], params: Optional[Dict[str, Any]], failure_message: str, error_message: str) -> Dict:
+        """GET a JSON endpoint and wrap the outcome in the standard result dict"""
+        try:
+            response = await self._request("GET", api_url, path, headers, params=params)
+            
+            if response.status_code == 200:
+                return {
+                    "success": True,
+                    "data": response.json(),
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": f"HTTP {response.status_code}",
+                    "message": failure_message
+                }
+                
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": error_message
+            }
+    
+    async def _single_flight(self, key: Tuple, load: Callable[[], Awaitable[Dict]]) -> Dict:
+        """
+        Run load() once for all concurrent callers with the same key.
+        
+        The upstream call runs in its own task, so a caller that is cancelled
+        (e.g. by a deadline) does not cancel it for the other waiters.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced_calls += 1
+            return await asyncio.shield(task)
+        
+        task = asyncio.create_task(load())
+        self._inflight[key] = task
+        
+        def done(finished: asyncio.Task) -> None:
+            self._inflight.pop(key, None)
+            if not finished.cancelled():
+                finished.exception()  # Mark as retrieved even if every waiter went away
+        
+        task.add_done_callback(done)
+        return await asyncio.shield(task)
+    
+    async def _get_json(self, api_url: str, path: str, headers: Dict[str, str], params: Optional[Dict[str, Any]], failure_message: str, error_message: str, use_cache: bool = True) -> Dict:
+        """
+        Cached GET of a bot endpoint with stale-while-revalidate.
+        
+        Fresh entries are returned directly. Entries past their TTL but within the
+        stale window are returned immediately while one background refresh runs.
+        Only successful results are cached. Cache misses and refreshes go
+        through single-flight, so concurrent callers share one upstream request.
+        With use_cache off (or no TTL for the path) the cache is neither read
+        nor written.
+        """
+        key = self._cache_key(api_url, path, headers, params)
+        
+        async def load() -> Dict:
+            return await self._single_flight(
+                key,
+                lambda: self._fetch_json(api_url, path, headers, params, failure_message, error_message)
+            )
+        
+        ttl = EXTERNAL_BOT_CACHE_TTLS.get(path) if use_cache else None
+        if not ttl:
+            return await load()
+        
+        cached, fresh = self.cache.lookup(key, fresh_ttl=ttl)
+        if cached is not None:
+            if not fresh:
+                self._schedule_refresh(key, ttl, load)
+            return cached
+        
+        result = await load()
+        self._store(key, ttl, result)
+        return result
+    
+    def _store(self, key: Tuple, ttl: float, result: Dict) -> None:
+        if result["success"]:
+            self.cache.set(key, result, ttl=ttl * (1 + EXTERNAL_BOT_CACHE_STALE_FACTOR))
+    
+    def _schedule_refresh(self, key: Tuple, ttl: float, load: Callable[[], Awaitable[Dict]]) -> None:
+        """Start a background refresh for key unless one is already running"""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        
+        async def refresh() -> None:
+            try:
+                self._store(key, ttl, await load())
+            finally:
+                self._refreshing.discard(key)
+        
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+    
+    async def test_bot_connection(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict:
         """
         Test connection to an external trading bot
         
@@ -55,15 +353,7 @@ class ExternalBotManager:
         )
         
         try:
-            headers = {'Content-Type': 'application/json'}
-            
-            # Set authentication headers based on method
-            if auth_method == "token":
-                headers['Authorization'] = f'Bearer {api_token}'
-            elif auth_method == "basic":
-                credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
-                headers['Authorization'] = f'Basic {credentials}'
-            else:
+            if auth_method not in ("token", "basic"):
                 return {
                     "success": False,
                     "status": "error",
@@ -71,13 +361,13 @@ class ExternalBotManager:
                     "message": "Invalid authentication method"
                 }
             
+            headers = {'Content-Type': 'application/json'}
+            headers.update(self._get_auth_headers(auth_method, api_token, username, password))
+            
             # Test basic connectivity with /api/v1/ping
             ping_start = time.time()
-            response = self.session.get(
-                f"{normalized_url}/api/v1/ping",
-                headers=headers,
-                timeout=self.timeout
-            )
+            # An explicit connection test always reaches the bot, even with an open circuit
+            response = await self._request("GET", normalized_url, "/api/v1/ping", headers, bypass_circuit=True)
             ping_duration = (time.time() - ping_start) * 1000
             
             log_external_api_call(
@@ -92,11 +382,7 @@ class ExternalBotManager:
             if response.status_code == 200:
                 # Get bot status and info
                 status_start = time.time()
-                status_response = self.session.get(
-                    f"{normalized_url}/api/v1/status",
-                    headers=headers,
-                    timeout=self.timeout
-                )
+                status_response = await self._request("GET", normalized_url, "/api/v1/status", headers, bypass_circuit=True)
                 status_duration = (time.time() - status_start) * 1000
                 
                 log_external_api_call(
@@ -162,13 +448,13 @@ class ExternalBotManager:
                     "message": "Failed to connect to trading bot"
                 }
                 
-        except requests.exceptions.ConnectTimeout:
+        except httpx.ConnectTimeout:
             logger.warning(
                 "Bot connection test timed out",
                 extra={
                     "api_url": normalized_url,
                     "event_type": "bot_connection_test_timeout",
-                    "timeout_seconds": self.timeout[0]
+                    "timeout_seconds": self._get_latency_tracker(normalized_url).timeouts_for("/api/v1/ping")[0]
                 }
             )
             
@@ -178,7 +464,7 @@ class ExternalBotManager:
                 "error": "Connection timeout",
                 "message": "Bot did not respond within timeout period"
             }
-        except requests.exceptions.ConnectionError as e:
+        except httpx.ConnectError as e:
             logger.warning(
                 "Bot connection test failed with connection error",
                 extra={
@@ -212,145 +498,95 @@ class ExternalBotManager:
                 "message": "Unexpected error during connection test"
             }
     
-    def get_bot_status(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict:
+    async def get_bot_status(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict:
         """Get current status of an external bot"""
-        try:
-            api_url = api_url.rstrip('/')
-            headers = {}
-            
-            # Set authentication headers
-            if auth_method == "token":
-                headers['Authorization'] = f'Bearer {api_token}'
-            elif auth_method == "basic":
-                credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
-                headers['Authorization'] = f'Basic {credentials}'
-            
-            response = self.session.get(
-                f"{api_url}/api/v1/status",
-                headers=headers,
-                timeout=self.timeout
-            )
+        api_url = api_url.rstrip('/')
+        headers = self._get_auth_headers(auth_method, api_token, username, password)
+        return await self._get_json(
+            api_url, "/api/v1/status", headers,
+            params=None,
+            failure_message="Failed to get bot status",
+            error_message="Error getting bot status"
+        )
+    
+    async def get_fleet_status(self, bots: List[Dict[str, Any]], max_concurrency: int, deadline: float) -> Dict[str, Dict]:
+        """
+        Fetch /api/v1/status for many bots concurrently
+        
+        Args:
+            bots: Dicts with a "bot_id" key plus the api_url and auth arguments
+                accepted by get_bot_status
+            max_concurrency: Maximum number of upstream calls in flight at once
+            deadline: Per-bot deadline in seconds, including time spent waiting
+                for a concurrency slot
             
-            if response.status_code == 200:
-                return {
-                    "success": True,
-                    "data": response.json(),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            else:
+        Returns:
+            Dict mapping bot_id to its get_bot_status result. Bots that miss the
+            deadline get a failed result with "timed_out" set.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def fetch(bot: Dict[str, Any]) -> Dict:
+            async with semaphore:
+                return await self.get_bot_status(
+                    api_url=bot["api_url"],
+                    auth_method=bot.get("auth_method") or "token",
+                    api_token=bot.get("api_token"),
+                    username=bot.get("username"),
+                    password=bot.get("password")
+                )
+        
+        async def fetch_with_deadline(bot: Dict[str, Any]) -> Dict:
+            try:
+                return await asyncio.wait_for(fetch(bot), timeout=deadline)
+            except asyncio.TimeoutError:
                 return {
                     "success": False,
-                    "error": f"HTTP {response.status_code}",
-                    "message": "Failed to get bot status"
+                    "timed_out": True,
+                    "error": "Timeout",
+                    "message": f"Bot did not respond within {deadline:g}s"
                 }
-                
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "message": "Error getting bot status"
-            }
+        
+        results = await asyncio.gather(*(fetch_with_deadline(bot) for bot in bots))
+        return {bot["bot_id"]: result for bot, result in zip(bots, results)}
     
-    def get_bot_performance(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict:
+    async def get_bot_performance(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict:
         """Get performance metrics from external bot"""
-        try:
-            api_url = api_url.rstrip('/')
-            headers = {}
-            
-            # Set authentication headers
-            if auth_method == "token":
-                headers['Authorization'] = f'Bearer {api_token}'
-            elif auth_method == "basic":
-                credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
-                headers['Authorization'] = f'Basic {credentials}'
-            
-            # Get performance data
-            response = self.session.get(
-                f"{api_url}/api/v1/performance",
-                headers=headers,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                return {
-                    "success": True,
-                    "data": response.json(),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code}",
-                    "message": "Failed to get performance data"
-                }
-                
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "message": "Error getting performance data"
-            }
+        api_url = api_url.rstrip('/')
+        headers = self._get_auth_headers(auth_method, api_token, username, password)
+        return await self._get_json(
+            api_url, "/api/v1/performance", headers,
+            params=None,
+            failure_message="Failed to get performance data",
+            error_message="Error getting performance data"
+        )
     
-    def get_bot_trades(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None, limit: int = 50) -> Dict:
-        """Get trade history from external bot"""
-        try:
-            api_url = api_url.rstrip('/')
-            headers = {}
-            
-            # Set authentication headers
-            if auth_method == "token":
-                headers['Authorization'] = f'Bearer {api_token}'
-            elif auth_method == "basic":
-                credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
-                headers['Authorization'] = f'Basic {credentials}'
-            
-            response = self.session.get(
-                f"{api_url}/api/v1/trades",
-                headers=headers,
-                params={'limit': limit},
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                return {
-                    "success": True,
-                    "data": response.json(),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code}",
-                    "message": "Failed to get trades"
-                }
-                
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "message": "Error getting trades"
-            }
+    async def get_bot_trades(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None, limit: int = 50, offset: Optional[int] = None, use_cache: bool = True) -> Dict:
+        """Get trade history from external bot. Bulk readers such as the trade syncer pass use_cache=False."""
+        api_url = api_url.rstrip('/')
+        headers = self._get_auth_headers(auth_method, api_token, username, password)
+        params = {'limit': limit}
+        if offset is not None:
+            params['offset'] = offset
+        return await self._get_json(
+            api_url, "/api/v1/trades", headers,
+            params=params,
+            failure_message="Failed to get trades",
+            error_message="Error getting trades",
+            use_cache=use_cache
+        )
     
-    def start_bot(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict:
+    async def start_bot(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict:
         """Start an external bot"""
         try:
             api_url = api_url.rstrip('/')
-            headers = {}
-            
-            # Set authentication headers
-            if auth_method == "token":
-                headers['Authorization'] = f'Bearer {api_token}'
-            elif auth_method == "basic":
-                credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
-                headers['Authorization'] = f'Basic {credentials}'
+            headers = self._get_auth_headers(auth_method, api_token, username, password)
             
-            response = self.session.post(
-                f"{api_url}/api/v1/start",
-                headers=headers,
-                timeout=self.timeout
-            )
+            response = await self._request("POST", api_url, "/api/v1/start", headers)
             
             if response.status_code == 200:
+                # The bot state just changed; don't serve a cached status
+                self.cache.delete(self._cache_key(api_url, "/api/v1/status", headers))
                 return {
                     "success": True,
                     "message": "Bot start command sent successfully",
@@ -370,26 +606,17 @@ class ExternalBotManager:
                 "message": "Error starting bot"
             }
     
-    def stop_bot(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict:
+    async def stop_bot(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict:
         """Stop an external bot"""
         try:
             api_url = api_url.rstrip('/')
-            headers = {}
-            
-            # Set authentication headers
-            if auth_method == "token":
-                headers['Authorization'] = f'Bearer {api_token}'
-            elif auth_method == "basic":
-                credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
-                headers['Authorization'] = f'Basic {credentials}'
+            headers = self._get_auth_headers(auth_method, api_token, username, password)
             
-            response = self.session.post(
-                f"{api_url}/api/v1/stop",
-                headers=headers,
-                timeout=self.timeout
-            )
+            response = await self._request("POST", api_url, "/api/v1/stop", headers)
             
             if response.status_code == 200:
+                # The bot state just changed; don't serve a cached status
+                self.cache.delete(self._cache_key(api_url, "/api/v1/status", headers))
                 return {
                     "success": True,
                     "message": "Bot stop command sent successfully",
@@ -409,70 +636,30 @@ class ExternalBotManager:
                 "message": "Error stopping bot"
             }
     
-    def get_bot_logs(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None, lines: int = 100) -> Dict:
+    async def get_bot_logs(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None, lines: int = 100) -> Dict:
         """Get logs from external bot"""
-        try:
-            api_url = api_url.rstrip('/')
-            headers = {}
-            
-            # Set authentication headers
-            if auth_method == "token":
-                headers['Authorization'] = f'Bearer {api_token}'
-            elif auth_method == "basic":
-                credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
-                headers['Authorization'] = f'Basic {credentials}'
-            
-            response = self.session.get(
-                f"{api_url}/api/v1/logs",
-                headers=headers,
-                params={'lines': lines},
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                return {
-                    "success": True,
-                    "data": response.json(),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code}", 
-                    "message": "Failed to get logs"
-                }
-                
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "message": "Error getting logs"
-            }
+        api_url = api_url.rstrip('/')
+        headers = self._get_auth_headers(auth_method, api_token, username, password)
+        return await self._get_json(
+            api_url, "/api/v1/logs", headers,
+            params={'lines': lines},
+            failure_message="Failed to get logs",
+            error_message="Error getting logs"
+        )
     
     async def ping_bot(self, api_url: str, auth_method: str = "token", api_token: Optional[str] = None, username: Optional[str] = None, password: Optional[str] = None) -> Dict:
         """Async ping to check bot health"""
         try:
             api_url = api_url.rstrip('/')
-            headers = {}
+            headers = self._get_auth_headers(auth_method, api_token, username, password)
             
-            # Set authentication headers
-            if auth_method == "token":
-                headers['Authorization'] = f'Bearer {api_token}'
-            elif auth_method == "basic":
-                credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
-                headers['Authorization'] = f'Basic {credentials}'
-            
-            # Use asyncio to make this non-blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.session.get(f"{api_url}/api/v1/ping", headers=headers, timeout=self.timeout)
-            )
+            ping_start = time.perf_counter()
+            response = await self._request("GET", api_url, "/api/v1/ping", headers)
             
             return {
                 "success": response.status_code == 200,
                 "timestamp": datetime.utcnow().isoformat(),
-                "response_time": response.elapsed.total_seconds() if hasattr(response, 'elapsed') else None
+                "response_time": time.perf_counter() - ping_start
             }
             
         except Exception as e:
@@ -480,4 +667,8 @@ class ExternalBotManager:
                 "success": False,
                 "error": str(e),
                 "timestamp": datetime.utcnow().isoformat()
-            }
\ No newline at end of file
+            }
+
+
+# Shared instance so every caller reuses the same per-host connection pools
+external_bot_manager = ExternalBotManager()
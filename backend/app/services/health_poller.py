@@ -0,0 +1,138 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from app.core.config import (
+    BOT_HEALTH_POLL_INTERVAL,
+    BOT_HEALTH_POLL_JITTER,
+    BOT_HEALTH_POLL_CONCURRENCY,
+)
+from app.core.logging import get_logger
+from app.crud import crud_bot
+from app.db.session import AsyncSessionLocal
+from app.services.external_bot_manager import ExternalBotManager, external_bot_manager
+from app.services.status_writer import BotStatusWriteBuffer, bot_status_writer
+
+logger = get_logger("health_poller")
+
+
+class BotHealthPoller:
+    """
+    Periodically pings every external bot and persists the result into
+    Bot.last_ping / Bot.connection_error, so list endpoints can show fresh
+    health without calling the bots on the request path. Results go through
+    the status write buffer, so unchanged health is not rewritten.
+
+    Within each cycle the probes are spread randomly over `jitter` seconds and
+    at most `concurrency` pings are in flight at once.
+    """
+
+    def __init__(
+        self,
+        manager: ExternalBotManager = external_bot_manager,
+        interval: float = BOT_HEALTH_POLL_INTERVAL,
+        jitter: float = BOT_HEALTH_POLL_JITTER,
+        concurrency: int = BOT_HEALTH_POLL_CONCURRENCY,
+        writer: BotStatusWriteBuffer = bot_status_writer,
+    ):
+        self.manager = manager
+        self.writer = writer
+        self.interval = interval
+        self.jitter = min(jitter, interval)
+        self.concurrency = concurrency
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the polling loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                "Bot health poller started",
+                extra={
+                    "event_type": "health_poller_started",
+                    "interval_seconds": self.interval,
+                    "jitter_seconds": self.jitter,
+                    "concurrency": self.concurrency,
+                }
+            )
+
+    async def stop(self) -> None:
+        """Cancel the polling loop and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            cycle_start = time.monotonic()
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "Bot health poll cycle failed",
+                    extra={"event_type": "health_poll_error", "error": str(e)},
+                    exc_info=True
+                )
+            elapsed = time.monotonic() - cycle_start
+            await asyncio.sleep(max(self.interval - elapsed, 0))
+
+    async def poll_once(self) -> None:
+        """Ping every external bot once and persist the results"""
+        async with AsyncSessionLocal() as db:
+            version = self.writer.version
+            targets = await crud_bot.get_external_bot_targets_async(db)
+        if not targets:
+            return
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def probe(target) -> Dict:
+            # Spread probes over the jitter window so bots are not all hit in the same second
+            await asyncio.sleep(random.uniform(0, self.jitter))
+            async with semaphore:
+                result = await self.manager.ping_bot(
+                    api_url=target.api_url,
+                    auth_method=target.auth_method or "token",
+                    api_token=target.api_token,
+                    username=target.username,
+                    password=target.password
+                )
+            if result["success"]:
+                return {
+                    "id": target.id,
+                    "last_ping": datetime.now(timezone.utc),
+                    "connection_error": None,
+                }
+            return {
+                "id": target.id,
+                "connection_error": result.get("error") or "Ping failed",
+            }
+
+        for target in targets:
+            self.writer.seed(target, version)
+        health_updates = await asyncio.gather(*(probe(target) for target in targets))
+        for update in health_updates:
+            self.writer.record(**update)
+        await self.writer.flush()
+
+        failed = sum(1 for update in health_updates if "last_ping" not in update)
+        logger.info(
+            "Bot health poll cycle completed",
+            extra={
+                "event_type": "health_poll_completed",
+                "bot_count": len(health_updates),
+                "failed_count": failed,
+            }
+        )
+
+
+health_poller = BotHealthPoller()
@@ -0,0 +1,73 @@
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+class HostLatencyTracker:
+    """
+    Rolling latency estimate for one bot host, used to pick request timeouts.
+
+    Samples are normalised by the endpoint multiplier before being recorded, so
+    slow-by-design endpoints (e.g. large /trades payloads) don't inflate the
+    estimate for cheap ones. Timeouts are derived from max(EWMA, p99) of the
+    normalised samples, scaled back up per endpoint and clamped to the
+    configured floor/ceiling. Until min_samples have been seen the static
+    default timeouts are used.
+    """
+
+    def __init__(
+        self,
+        default_timeout: Tuple[float, float],
+        connect_bounds: Tuple[float, float],
+        read_bounds: Tuple[float, float],
+        endpoint_multipliers: Dict[str, float],
+        safety_factor: float,
+        alpha: float,
+        window: int,
+        min_samples: int,
+    ):
+        self.default_timeout = default_timeout
+        self.connect_bounds = connect_bounds
+        self.read_bounds = read_bounds
+        self.endpoint_multipliers = endpoint_multipliers
+        self.safety_factor = safety_factor
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.ewma: Optional[float] = None
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._p99: Optional[float] = None  # Cached until the next sample
+
+    def _multiplier(self, path: str) -> float:
+        return self.endpoint_multipliers.get(path, 1.0)
+
+    def observe(self, path: str, seconds: float) -> None:
+        """Record the duration of a completed request (or of a timed-out one)"""
+        normalized = seconds / self._multiplier(path)
+        self.ewma = normalized if self.ewma is None else self.alpha * normalized + (1 - self.alpha) * self.ewma
+        self._samples.append(normalized)
+        self._p99 = None
+
+    def p99(self) -> Optional[float]:
+        if not self._samples:
+            return None
+        if self._p99 is None:
+            ordered = sorted(self._samples)
+            self._p99 = ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)]
+        return self._p99
+
+    def timeouts_for(self, path: str) -> Tuple[float, float]:
+        """(connect_timeout, read_timeout) in seconds for a request to path"""
+        if len(self._samples) < self.min_samples:
+            return self.default_timeout
+        budget = max(self.ewma, self.p99()) * self.safety_factor
+        connect = min(max(budget, self.connect_bounds[0]), self.connect_bounds[1])
+        read = budget * self._multiplier(path)
+        read = min(max(read, self.read_bounds[0]), self.read_bounds[1])
+        return connect, read
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "samples": len(self._samples),
+            "ewma_ms": self.ewma * 1000 if self.ewma is not None else None,
+            "p99_ms": self.p99() * 1000 if self._samples else None,
+            "timeouts": self.timeouts_for(""),
+        }
@@ -0,0 +1,22 @@
+from typing import Any, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import MARKETPLACE_CACHE_TTL
+
+# The marketplace listing is the same for every user; cache the assembled response
+_MARKETPLACE_CACHE_KEY = "marketplace"
+marketplace_cache = TTLCache(max_entries=1, default_ttl=MARKETPLACE_CACHE_TTL)
+
+
+def get_cached_marketplace() -> Optional[Any]:
+    """The cached marketplace listing, None when missing or expired"""
+    return marketplace_cache.get(_MARKETPLACE_CACHE_KEY)
+
+
+def cache_marketplace(listing: Any) -> None:
+    marketplace_cache.set(_MARKETPLACE_CACHE_KEY, listing)
+
+
+def invalidate_marketplace_cache() -> None:
+    """Drop the cached marketplace listing after template or subscription changes"""
+    marketplace_cache.delete(_MARKETPLACE_CACHE_KEY)
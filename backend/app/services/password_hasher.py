@@ -0,0 +1,84 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core import security
+from app.core.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_LIMIT
+from app.core.logging import get_logger
+
+logger = get_logger("password_hasher")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool and its queue are full"""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification in a bounded process pool, so a login
+    does not block the event loop (and all other requests on this worker) for
+    the 100-300 ms bcrypt takes.
+
+    At most `workers` operations run at once and `queue_limit` more may wait;
+    further calls fail fast with PasswordHasherBusy.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, queue_limit: int = PASSWORD_HASH_QUEUE_LIMIT):
+        self.workers = max(workers, 1)
+        self.queue_limit = max(queue_limit, 0)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        """
+        Create the process pool and start its workers. Called at application
+        startup. Workers are started from a fork server (spawned where that is
+        unavailable), not forked from this process: by then the logging
+        listener thread is running, and a forked child could inherit its locks
+        held and log into a queue nobody drains.
+        """
+        if self._executor is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(method)
+            )
+            self._executor.submit(int)  # Launches the worker processes
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._in_flight >= self.workers + self.queue_limit:
+            self.rejected += 1
+            logger.warning(
+                "Password hashing pool saturated",
+                extra={"event_type": "password_hasher_saturated", "in_flight": self._in_flight},
+            )
+            raise PasswordHasherBusy()
+        self.start()
+        self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(security.get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(security.verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": self._in_flight,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher()
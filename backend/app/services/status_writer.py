@@ -0,0 +1,190 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.core.config import BOT_STATUS_FLUSH_INTERVAL, BOT_STATUS_PING_RESOLUTION
+from app.core.logging import get_logger
+from app.crud import crud_bot
+from app.db.session import AsyncSessionLocal
+
+logger = get_logger("status_writer")
+
+_UNSET = object()
+
+
+class BotStatusWriteBuffer:
+    """
+    Coalesces bot status writes (status, connection_error, last_ping).
+
+    record() only keeps the latest value of each column per bot in memory;
+    flush() writes everything pending in one bulk UPDATE keyed on the bot
+    primary key. Values equal to the last ones written are dropped, and a
+    last_ping that is the only change is written at most once per
+    ping_resolution seconds, so steady-state polling of a healthy bot
+    causes almost no database writes.
+
+    Database status may lag the live status by up to one flush interval.
+
+    Rows passed to seed() must come with the `version` read before they were
+    loaded. A flush bumps the version when it takes its batch, so a snapshot
+    that may predate the flush's commit cannot overwrite what the flush wrote.
+    """
+
+    def __init__(
+        self,
+        interval: float = BOT_STATUS_FLUSH_INTERVAL,
+        ping_resolution: float = BOT_STATUS_PING_RESOLUTION,
+    ):
+        self.interval = interval
+        self.ping_resolution = ping_resolution
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        # Last values written (or loaded) per bot primary key
+        self._written: Dict[int, Dict[str, Any]] = {}
+        # Version at which each bot was last taken into a flush
+        self._flushed_version: Dict[int, int] = {}
+        self.version = 0
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.skipped = 0
+        self.flushed_rows = 0
+        self.flushes = 0
+
+    def start(self) -> None:
+        """Start the flush loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write what is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def seed(self, bot, version: int) -> None:
+        """
+        Take the stored values of a bot loaded from the database as the last
+        written ones, so writes made elsewhere (other code paths, other
+        workers) are seen. `version` is self.version read before the row was
+        loaded; if the bot was flushed since, the values this buffer wrote are
+        kept over the possibly older row.
+        """
+        stored = {
+            "status": bot.status,
+            "connection_error": bot.connection_error,
+            "last_ping": bot.last_ping,
+        }
+        if self._flushed_version.get(bot.id, 0) > version:
+            stored.update(self._written.get(bot.id, {}))
+        self._written[bot.id] = stored
+
+    def note_written(self, id: int, **values: Any) -> None:
+        """
+        Record values written to a bot directly, outside the buffer. Pending
+        values of the same columns are older and are dropped.
+        """
+        pending = self._pending.get(id)
+        if pending:
+            for column in values:
+                pending.pop(column, None)
+            if not pending:
+                del self._pending[id]
+        self._written.setdefault(id, {}).update(values)
+
+    def record(
+        self,
+        id: int,
+        status: Any = _UNSET,
+        connection_error: Any = _UNSET,
+        last_ping: Any = _UNSET,
+    ) -> None:
+        """Queue new values for a bot; columns left out keep their stored value"""
+        self.recorded += 1
+        values = {
+            column: value
+            for column, value in (
+                ("status", status),
+                ("connection_error", connection_error),
+                ("last_ping", last_ping),
+            )
+            if value is not _UNSET
+        }
+        written = self._written.get(id, {})
+        pending = self._pending.get(id, {})
+        changes = {}
+        for column, value in values.items():
+            if column == "last_ping":
+                continue
+            if column in pending or written.get(column, _UNSET) != value:
+                changes[column] = value
+        if "last_ping" in values and (
+            changes or "last_ping" in pending or self._ping_due(written.get("last_ping"), values["last_ping"])
+        ):
+            changes["last_ping"] = values["last_ping"]
+
+        if not changes:
+            self.skipped += 1
+            return
+        self._pending.setdefault(id, {}).update(changes)
+
+    def _ping_due(self, written: Optional[datetime], value: Optional[datetime]) -> bool:
+        if written is None or value is None:
+            return written is not value
+        if (written.tzinfo is None) != (value.tzinfo is None):
+            # SQLite returns naive UTC datetimes
+            written, value = written.replace(tzinfo=None), value.replace(tzinfo=None)
+        return (value - written).total_seconds() >= self.ping_resolution
+
+    def discard(self, id: int) -> None:
+        """Forget a bot, e.g. after it was deleted"""
+        self._pending.pop(id, None)
+        self._written.pop(id, None)
+        self._flushed_version.pop(id, None)
+
+    async def flush(self) -> int:
+        """Write all pending values in one bulk UPDATE. Returns the number of rows written."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        self.version += 1
+        for id in pending:
+            self._flushed_version[id] = self.version
+        rows = [{"id": id, **values} for id, values in pending.items()]
+        try:
+            async with AsyncSessionLocal() as db:
+                await crud_bot.update_bots_health_async(db, rows)
+        except Exception as e:
+            # Put the batch back; values recorded meanwhile are newer and win
+            for id, values in pending.items():
+                self._pending[id] = {**values, **self._pending.get(id, {})}
+            logger.error(
+                "Bot status flush failed",
+                extra={"event_type": "bot_status_flush_error", "row_count": len(rows), "error": str(e)},
+            )
+            return 0
+        for id, values in pending.items():
+            self._written.setdefault(id, {}).update(values)
+        self.flushes += 1
+        self.flushed_rows += len(rows)
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "recorded": self.recorded,
+            "skipped": self.skipped,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+        }
+
+
+bot_status_writer = BotStatusWriteBuffer()
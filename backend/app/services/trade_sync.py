@@ -0,0 +1,227 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.config import (
+    TRADE_SYNC_INTERVAL,
+    TRADE_SYNC_CONCURRENCY,
+    TRADE_SYNC_PAGE_SIZE,
+    TRADE_SYNC_OVERLAP,
+)
+from app.core.logging import get_logger
+from app.crud import crud_bot, crud_trade
+from app.db.session import AsyncSessionLocal
+from app.services.external_bot_manager import ExternalBotManager, external_bot_manager
+
+logger = get_logger("trade_sync")
+
+
+def _from_timestamp_ms(value: Optional[int]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+def trade_row_from_api(trade: Dict[str, Any], bot_id: str, tenant_id: str) -> Dict[str, Any]:
+    """Map a trade from the bot's /api/v1/trades response onto Trade columns"""
+    return {
+        "bot_id": bot_id,
+        "tenant_id": tenant_id,
+        "trade_id": trade["trade_id"],
+        "pair": trade.get("pair"),
+        "is_open": bool(trade.get("is_open", False)),
+        "open_date": _from_timestamp_ms(trade.get("open_timestamp")),
+        "close_date": _from_timestamp_ms(trade.get("close_timestamp")),
+        "open_rate": trade.get("open_rate"),
+        "close_rate": trade.get("close_rate"),
+        "amount": trade.get("amount"),
+        "stake_amount": trade.get("stake_amount"),
+        "profit_abs": trade.get("profit_abs", trade.get("close_profit_abs")),
+        "profit_ratio": trade.get("profit_ratio", trade.get("close_profit")),
+        "exit_reason": trade.get("exit_reason", trade.get("sell_reason")),
+    }
+
+
+class TradeSyncer:
+    """
+    Periodically pulls new closed trades from every external bot into the local
+    trades table, so trade history is served from the database instead of being
+    re-downloaded from the bot on every request.
+
+    The bot's /api/v1/trades lists closed trades in trade_id order and only
+    pages by offset. Each sync re-reads from the watermark `overlap` ids below
+    the highest stored trade_id, to catch trades that closed out of id order;
+    the watermark's position in the list is the number of stored trades up to
+    it. Rows are upserted in bulk on (bot_id, trade_id), so re-read trades are
+    harmless.
+
+    Two checks fall back to a full re-read from offset 0, so trades are never
+    skipped for good: the trade just before the resume position must be at or
+    below the watermark (it is not when the bot pruned trades we still store),
+    and afterwards the bot's total_trades must not exceed what is stored (it
+    does when a trade below the watermark closed late or rows were removed
+    locally).
+    """
+
+    def __init__(
+        self,
+        manager: ExternalBotManager = external_bot_manager,
+        interval: float = TRADE_SYNC_INTERVAL,
+        concurrency: int = TRADE_SYNC_CONCURRENCY,
+        page_size: int = TRADE_SYNC_PAGE_SIZE,
+        overlap: int = TRADE_SYNC_OVERLAP,
+    ):
+        self.manager = manager
+        self.interval = interval
+        self.concurrency = concurrency
+        self.page_size = page_size
+        self.overlap = overlap
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start the sync loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                "Trade syncer started",
+                extra={"event_type": "trade_sync_started", "interval_seconds": self.interval}
+            )
+
+    async def stop(self) -> None:
+        """Cancel the sync loop and any one-off syncs"""
+        tasks = list(self._pending)
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    def sync_bot_soon(self, target) -> None:
+        """Sync one bot in the background, e.g. right after it was connected"""
+        task = asyncio.create_task(self.sync_bot(target))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _run(self) -> None:
+        while True:
+            cycle_start = time.monotonic()
+            try:
+                await self.sync_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "Trade sync cycle failed",
+                    extra={"event_type": "trade_sync_error", "error": str(e)},
+                    exc_info=True
+                )
+            elapsed = time.monotonic() - cycle_start
+            await asyncio.sleep(max(self.interval - elapsed, 0))
+
+    async def sync_all(self) -> None:
+        """Sync trades of every external bot once"""
+        async with AsyncSessionLocal() as db:
+            targets = await crud_bot.get_external_bot_targets_async(db)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def sync(target) -> int:
+            async with semaphore:
+                return await self.sync_bot(target)
+
+        synced = await asyncio.gather(*(sync(target) for target in targets))
+        logger.info(
+            "Trade sync cycle completed",
+            extra={
+                "event_type": "trade_sync_completed",
+                "bot_count": len(targets),
+                "trades_synced": sum(synced),
+            }
+        )
+
+    async def sync_bot(self, target) -> int:
+        """
+        Pull trades newer than what is stored for one bot.
+        target needs bot_id, tenant_id, api_url and the bot's credentials.
+        Returns the number of trades upserted.
+        """
+        async with AsyncSessionLocal() as db:
+            highest = await crud_trade.get_max_trade_id_async(db, bot_id=target.bot_id)
+            if highest is None:
+                watermark, offset = None, 0
+            else:
+                watermark = highest - self.overlap
+                offset = await crud_trade.count_trades_async(db, bot_id=target.bot_id, max_trade_id=watermark)
+
+        synced, complete = await self._sync_from(target, offset, watermark)
+        if not complete:
+            logger.info(
+                "Trade sync re-reading full history",
+                extra={"event_type": "trade_sync_rescan", "bot_id": target.bot_id, "resume_offset": offset}
+            )
+            rescanned, _ = await self._sync_from(target, 0, None)
+            synced += rescanned
+        return synced
+
+    async def _sync_from(self, target, offset: int, watermark: Optional[int]) -> Tuple[int, bool]:
+        """
+        Upsert the bot's trades from offset on. Returns the number of trades
+        upserted and whether the result is known to be complete.
+        """
+        # Start one trade early to verify the resume position
+        verify = offset > 0 and watermark is not None
+        if verify:
+            offset -= 1
+        synced = 0
+        total_trades = None
+        while True:
+            result = await self.manager.get_bot_trades(
+                api_url=target.api_url,
+                auth_method=target.auth_method or "token",
+                api_token=target.api_token,
+                username=target.username,
+                password=target.password,
+                limit=self.page_size,
+                offset=offset,
+                # Pages are read once; caching them would only hold trade history in memory
+                use_cache=False
+            )
+            if not result["success"]:
+                logger.warning(
+                    "Trade sync failed for bot",
+                    extra={
+                        "event_type": "trade_sync_bot_failure",
+                        "bot_id": target.bot_id,
+                        "error": result.get("error"),
+                    }
+                )
+                # Retried next cycle; not a reason for a full re-read
+                return synced, True
+
+            data = result["data"]
+            trades = data.get("trades", []) if isinstance(data, dict) else data
+            if isinstance(data, dict):
+                total_trades = data.get("total_trades", total_trades)
+            if verify:
+                verify = False
+                if not trades or trades[0]["trade_id"] > watermark:
+                    # Fewer trades up to the watermark upstream than stored: resumed too far
+                    return synced, False
+            rows = [trade_row_from_api(trade, target.bot_id, target.tenant_id) for trade in trades]
+            async with AsyncSessionLocal() as db:
+                synced += await crud_trade.upsert_trades_async(db, rows)
+            if len(trades) < self.page_size:
+                break
+            offset += len(trades)
+
+        if total_trades is not None:
+            async with AsyncSessionLocal() as db:
+                stored = await crud_trade.count_trades_async(db, bot_id=target.bot_id)
+            if stored < total_trades:
+                return synced, False
+        return synced, True
+
+
+trade_syncer = TradeSyncer()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for app.core.logging.DatadogJSONFormatter.
+
+Formats typical records (an api_response record with its structured fields, and
+an error record with a traceback) and reports records per second for:
+
+  legacy  the previous python-json-logger based formatter (only when
+          python-json-logger is installed)
+  json    the current formatter serialising with the stdlib json module
+  orjson  the current formatter serialising with orjson (when installed)
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_log_formatter [--records 100000]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import traceback
+import uuid
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import logging as app_logging  # noqa: E402
+
+try:
+    from pythonjsonlogger import jsonlogger
+except ImportError:
+    jsonlogger = None
+
+
+if jsonlogger is not None:
+    class LegacyDatadogJSONFormatter(jsonlogger.JsonFormatter):
+        """The formatter DatadogJSONFormatter replaced"""
+
+        def add_fields(self, log_record, record, message_dict):
+            super().add_fields(log_record, record, message_dict)
+            log_record['timestamp'] = datetime.utcnow().isoformat() + 'Z'
+            log_record['level'] = record.levelname
+            log_record['logger_name'] = record.name
+            log_record['service'] = 'tradewise-backend'
+            log_record['environment'] = 'development'
+            log_record['process_id'] = record.process
+            log_record['thread_id'] = record.thread
+            log_record['source'] = {
+                'file': record.pathname,
+                'line': record.lineno,
+                'function': record.funcName
+            }
+            if record.exc_info:
+                log_record['exception'] = {
+                    'type': record.exc_info[0].__name__ if record.exc_info[0] else None,
+                    'message': str(record.exc_info[1]) if record.exc_info[1] else None,
+                    'traceback': traceback.format_exception(*record.exc_info)
+                }
+
+
+def _record(msg: str, level: int = logging.INFO, exc_info=None, **extra) -> logging.LogRecord:
+    return logging.getLogger("app.api").makeRecord(
+        "app.api", level, __file__, 42, msg, None, exc_info, func="handler", extra=extra
+    )
+
+
+def sample_records():
+    response = _record(
+        "API response",
+        event_type="api_response",
+        http_method="GET",
+        path="/api/v1/external-bots/ext_1a2b3c4d/status",
+        status_code=200,
+        response_time_ms=12.3456,
+        user_id="42",
+        tenant_id=str(uuid.uuid4()),
+        request_id=str(uuid.uuid4()),
+    )
+    try:
+        raise ConnectionError("Connection refused")
+    except ConnectionError:
+        error = _record(
+            "Bot connection test failed",
+            level=logging.ERROR,
+            exc_info=sys.exc_info(),
+            event_type="bot_connection_test_failure",
+            api_url="http://10.0.0.12:8080",
+            total_duration_ms=5001.2,
+        )
+    return {"api_response": response, "error": error}
+
+
+def _stdlib_dumps(payload):
+    return json.dumps(payload, default=app_logging._json_default, separators=(",", ":"))
+
+
+def measure(formatter: logging.Formatter, record: logging.LogRecord, count: int) -> float:
+    """Records per second"""
+    for _ in range(min(count, 1000)):
+        record.exc_text = None
+        formatter.format(record)
+    start = time.perf_counter()
+    for _ in range(count):
+        # Formatters cache the traceback text on the record; real records are formatted once
+        record.exc_text = None
+        formatter.format(record)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+
+    variants = []
+    if jsonlogger is not None:
+        variants.append(("legacy", LegacyDatadogJSONFormatter(
+            fmt='%(timestamp)s %(level)s %(logger_name)s %(message)s'
+        ), None))
+    else:
+        print("python-json-logger is not installed, skipping the legacy formatter")
+    variants.append(("json", app_logging.DatadogJSONFormatter(), _stdlib_dumps))
+    if app_logging.orjson is not None:
+        variants.append(("orjson", app_logging.DatadogJSONFormatter(), app_logging._dumps))
+
+    records = sample_records()
+    print(f"{'formatter':>10} " + " ".join(f"{name + ' rec/s':>18}" for name in records))
+    fast_dumps = app_logging._dumps
+    for name, formatter, dumps in variants:
+        app_logging._dumps = dumps or fast_dumps
+        try:
+            rates = [measure(formatter, record, args.records) for record in records.values()]
+        finally:
+            app_logging._dumps = fast_dumps
+        print(f"{name:>10} " + " ".join(f"{rate:>18,.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark for password verification.
+
+Runs a burst of concurrent bcrypt verifications (the CPU part of a login) once
+inline on the event loop, the way /auth/token used to, and then through
+app.services.password_hasher.PasswordHasher with different process pool sizes.
+For each run it reports logins per second and the worst event loop stall,
+measured by a 10 ms ticker running alongside. The stall is the latency every
+other request on the worker would see.
+
+Throughput scales with the pool size up to the number of CPU cores.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_login_throughput [--logins 64] [--workers 1 2 4 8]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import security  # noqa: E402
+from app.services.password_hasher import PasswordHasher  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+TICK = 0.01
+
+
+async def _measure(verify, logins: int):
+    """Runs `logins` concurrent verifications; returns (seconds, worst loop stall in seconds)"""
+    stall = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal stall
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            stall = max(stall, time.perf_counter() - start - TICK)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(verify() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ticker_task
+    assert all(results)
+    return elapsed, stall
+
+
+async def run(logins: int, worker_counts):
+    hashed = security.get_password_hash(PASSWORD)
+
+    async def inline_verify():
+        return security.verify_password(PASSWORD, hashed)
+
+    print(f"CPU cores: {os.cpu_count()}, concurrent logins: {logins}")
+    print(f"{'mode':>12} {'logins/s':>10} {'total s':>9} {'max loop stall ms':>18}")
+    elapsed, stall = await _measure(inline_verify, logins)
+    print(f"{'inline':>12} {logins / elapsed:>10.1f} {elapsed:>9.2f} {stall * 1000:>18.1f}")
+
+    for workers in worker_counts:
+        hasher = PasswordHasher(workers=workers, queue_limit=logins)
+        try:
+            # Spawn and warm up the worker processes outside the measurement
+            await asyncio.gather(*(hasher.verify(PASSWORD, hashed) for _ in range(workers)))
+            elapsed, stall = await _measure(lambda: hasher.verify(PASSWORD, hashed), logins)
+        finally:
+            hasher.shutdown()
+        label = f"pool x{workers}"
+        print(f"{label:>12} {logins / elapsed:>10.1f} {elapsed:>9.2f} {stall * 1000:>18.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for app.middleware.logging.RequestLoggingMiddleware.
+
+Calls a tiny FastAPI app directly through ASGI (no server, no sockets), so the
+numbers are the cost of the middleware itself. Compares the app without
+logging middleware, with the previous BaseHTTPMiddleware implementation (kept
+here as LegacyRequestLoggingMiddleware) and with the current ASGI one. Log
+records go through the app's JSON formatter into /dev/null, inline or, with
+--queue, on the background logging thread. --sink-latency-ms makes every log
+write block for that long, like stdout piped into a slow log shipper.
+
+Reports per-request latency for a small JSON response, and time to first byte
+and total time for a streamed response whose chunks are produced 5 ms apart.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_request_logging [--requests 5000] [--chunks 20]
+        [--queue] [--sink-latency-ms 0]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.core.logging import log_api_request, log_api_response, setup_logging, stop_logging  # noqa: E402
+from app.middleware.logging import RequestLoggingMiddleware  # noqa: E402
+
+CHUNK_DELAY = 0.005
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation RequestLoggingMiddleware replaced"""
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = str(uuid.uuid4())
+        start_time = time.time()
+        log_api_request(
+            method=request.method,
+            path=str(request.url.path),
+            request_id=request_id,
+            client_ip=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent"),
+            query_params=dict(request.query_params) if request.query_params else None
+        )
+        response = await call_next(request)
+        log_api_response(
+            method=request.method,
+            path=str(request.url.path),
+            status_code=response.status_code,
+            response_time_ms=(time.time() - start_time) * 1000,
+            request_id=request_id
+        )
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class SlowSink(io.TextIOWrapper):
+    """/dev/null that takes `latency` seconds per write"""
+
+    def __init__(self, latency: float):
+        super().__init__(open(os.devnull, "wb"))
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        time.sleep(self.latency)
+        return super().write(text)
+
+
+def build_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    async def stream(chunks: int = 20):
+        async def body():
+            for i in range(chunks):
+                yield f"line {i}\n".encode()
+                await asyncio.sleep(CHUNK_DELAY)
+
+        return StreamingResponse(body(), media_type="text/plain")
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+async def call(app, path: str, query: bytes = b""):
+    """Runs one request; returns (time to first body byte, total time) in seconds"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query,
+        "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    request_sent = False
+    disconnected = asyncio.Event()
+    first_byte = None
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal first_byte
+        if message["type"] == "http.response.body" and first_byte is None and message.get("body"):
+            first_byte = time.perf_counter()
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    end = time.perf_counter()
+    disconnected.set()
+    return first_byte - start, end - start
+
+
+def _percentile(ordered, q: float) -> float:
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+async def run(requests: int, chunks: int, use_queue: bool, sink_latency: float):
+    setup_logging("INFO", use_queue=use_queue, stream=SlowSink(sink_latency))
+
+    variants = [
+        ("none", build_app()),
+        ("legacy", build_app(LegacyRequestLoggingMiddleware)),
+        ("asgi", build_app(RequestLoggingMiddleware)),
+    ]
+
+    print(f"JSON response, {requests} sequential requests")
+    print(f"{'middleware':>10} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'req/s':>9}")
+    for name, app in variants:
+        for _ in range(200):
+            await call(app, "/ping")
+        samples = sorted([(await call(app, "/ping"))[1] for _ in range(requests)])
+        mean = sum(samples) / len(samples)
+        print(
+            f"{name:>10} {mean * 1e6:>9.1f} {_percentile(samples, 0.5) * 1e6:>9.1f}"
+            f" {_percentile(samples, 0.99) * 1e6:>9.1f} {1 / mean:>9.0f}"
+        )
+
+    print()
+    print(f"Streamed response, {chunks} chunks {CHUNK_DELAY * 1000:.0f} ms apart")
+    print(f"{'middleware':>10} {'first byte ms':>14} {'total ms':>9}")
+    query = f"chunks={chunks}".encode()
+    for name, app in variants:
+        first_byte, total = await call(app, "/stream", query)
+        print(f"{name:>10} {first_byte * 1000:>14.2f} {total * 1000:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--queue", action="store_true", help="log through the background queue")
+    parser.add_argument("--sink-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.requests, args.chunks, args.queue, args.sink_latency_ms / 1000))
+    finally:
+        stop_logging()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add composite and partial indexes to the bots table.
+
+On PostgreSQL the indexes are built with CREATE INDEX CONCURRENTLY, so large
+existing tables are not locked against writes while the index is built.
+Concurrent builds cannot run inside a transaction, so every statement runs in
+autocommit mode. An index left INVALID by an interrupted concurrent build is
+dropped and rebuilt.
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, inspect, text
+from app.core.config import DATABASE_URL
+
+# (index name, table, column list, partial index predicate or None)
+# Keep in sync with the Index definitions in app/models/bot.py; partial index
+# predicates must match the query's WHERE term for the planner to use them
+INDEXES = [
+    ("ix_bots_tenant_type_api_url", "bots", "tenant_id, bot_type, api_url", None),
+    ("ix_bots_tenant_created", "bots", "tenant_id, created_at, id", None),
+    ("ix_bots_tenant_type_created", "bots", "tenant_id, bot_type, created_at, id", None),
+    ("ix_bots_public_shared", "bots", "bot_type, is_public", "is_public IS true"),
+    ("ix_bots_config_template_tenant", "bots", "config_template, tenant_id", "config_template IS NOT NULL"),
+]
+
+
+def _create_index_sql(name: str, table: str, columns: str, where: str, concurrently: bool) -> str:
+    sql = f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name} ON {table} ({columns})"
+    if where:
+        sql += f" WHERE {where}"
+    return sql
+
+
+def migrate_indexes():
+    """Create the bots table indexes without blocking writes."""
+
+    engine = create_engine(DATABASE_URL)
+    is_postgres = engine.dialect.name == "postgresql"
+
+    tables = {table for _, table, _, _ in INDEXES}
+    missing = [table for table in sorted(tables) if not inspect(engine).has_table(table)]
+    if missing:
+        # Fresh database: init_db() creates the tables together with their indexes
+        print(f"Skipping index migration, table(s) not created yet: {', '.join(missing)}")
+        return True
+
+    try:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            print("Starting index migration...")
+
+            for i, (name, table, columns, where) in enumerate(INDEXES, 1):
+                print(f"Creating index {i}/{len(INDEXES)}: {name} ON {table} ({columns})")
+
+                if is_postgres:
+                    invalid = connection.execute(
+                        text(
+                            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                            "WHERE c.relname = :name AND NOT i.indisvalid"
+                        ),
+                        {"name": name},
+                    ).first()
+                    if invalid:
+                        print(f"  Dropping invalid index {name} left by an interrupted build")
+                        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+                connection.execute(
+                    text(_create_index_sql(name, table, columns, where, concurrently=is_postgres))
+                )
+                print(f"✓ {name} ready")
+
+            print("\nIndex migration completed successfully!")
+
+    except Exception as e:
+        print(f"Index migration failed: {e}")
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    print("FreqTrade SaaS Index Migration")
+    print("==============================")
+
+    success = migrate_indexes()
+    if success:
+        print("\n✓ Database index migration completed successfully!")
+    else:
+        print("\n✗ Database index migration failed!")
+        sys.exit(1)
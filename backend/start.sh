@@ -9,5 +9,8 @@ python migrate_bot_table.py << EOF
 y
 EOF
 
+echo "Creating database indexes..."
+python migrate_bot_indexes.py
+
 echo "Starting FastAPI server..."
 uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
\ No newline at end of file
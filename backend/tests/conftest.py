@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read when app modules are imported: point the app at a
+# throwaway SQLite database and keep the background jobs off
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='tradewise-tests-')}/test.db"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["BOT_HEALTH_POLL_ENABLED"] = "false"
+os.environ["TRADE_SYNC_ENABLED"] = "false"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core import security  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import bot as models_bot, user as models_user  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def user(client):
+    db = SessionLocal()
+    try:
+        db_user = models_user.User(email=f"{uuid.uuid4().hex[:12]}@example.com", hashed_password="unused")
+        db.add(db_user)
+        db.commit()
+        return db_user
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def auth_headers(user):
+    token = security.create_access_token({"sub": user.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def external_bot(user):
+    db = SessionLocal()
+    try:
+        db_bot = models_bot.Bot(
+            bot_id=f"ext_{uuid.uuid4().hex[:8]}",
+            tenant_id=user.tenant_id,
+            bot_type="external",
+            name="test bot",
+            api_url="http://bot.test:8080",
+            api_token="token",
+            status="connected",
+        )
+        db.add(db_bot)
+        db.commit()
+        return db_bot
+    finally:
+        db.close()
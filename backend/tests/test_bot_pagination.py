@@ -0,0 +1,48 @@
+"""
+Keyset pagination of a tenant's bots on (created_at, id).
+"""
+import uuid
+
+from app.db.session import SessionLocal
+from app.models import bot as models_bot
+
+
+def _create_bots(user, count: int) -> list:
+    db = SessionLocal()
+    try:
+        bots = [
+            models_bot.Bot(bot_id=f"ext_{uuid.uuid4().hex[:8]}", tenant_id=user.tenant_id, bot_type="external",
+                           name=f"bot {i}", api_url=f"http://bot{i}.test:8080", status="connected")
+            for i in range(count)
+        ]
+        # One INSERT batch: the bots share a created_at second
+        db.add_all(bots)
+        db.commit()
+        return [bot.bot_id for bot in bots]
+    finally:
+        db.close()
+
+
+def test_paging_through_bots_created_in_the_same_second(client, user, auth_headers):
+    bot_ids = _create_bots(user, 5)
+
+    seen, cursor = [], None
+    for _ in range(5):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/bots", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        seen += [bot["bot_id"] for bot in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == bot_ids
+
+
+def test_skip_is_still_accepted(client, user, auth_headers):
+    bot_ids = _create_bots(user, 3)
+
+    response = client.get("/api/v1/bots", params={"skip": 1, "limit": 10}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [bot["bot_id"] for bot in response.json()] == bot_ids[1:]
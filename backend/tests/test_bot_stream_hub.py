@@ -0,0 +1,77 @@
+"""
+BotStreamHub: one poller per watched bot, stopped with its last subscriber,
+and only the latest update kept for subscribers that read slowly.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.services.bot_stream_hub import BotStreamHub, BotStreamSubscriber
+from app.services.status_writer import BotStatusWriteBuffer
+
+
+class FakeStatusApi:
+    def __init__(self):
+        self.calls = 0
+
+    async def get_bot_status(self, **kwargs):
+        self.calls += 1
+        return {"success": True, "data": [{"trade_id": self.calls}], "timestamp": "2024-01-01T00:00:00"}
+
+    def get_circuit_state(self, api_url):
+        return {"state": "closed"}
+
+
+def _target(bot_id: str = "ext_stream"):
+    return SimpleNamespace(
+        id=1, bot_id=bot_id, api_url="http://bot.test:8080", auth_method="token", api_token="token",
+        username=None, password=None, status="running", connection_error=None, last_ping=None,
+    )
+
+
+def _hub() -> BotStreamHub:
+    return BotStreamHub(manager=FakeStatusApi(), interval=0.01, writer=BotStatusWriteBuffer(interval=3600))
+
+
+def test_poller_is_shared_and_cancelled_with_last_subscriber(client):
+    async def scenario():
+        hub = _hub()
+        first, second = BotStreamSubscriber(), BotStreamSubscriber()
+        hub.subscribe(first, _target(), 0)
+        hub.subscribe(second, _target(), 0)
+        task = hub._topics["ext_stream"].task
+        assert hub.stats()["bots"] == 1 and hub.stats()["subscriptions"] == 2
+
+        hub.unsubscribe(first)
+        await asyncio.sleep(0)
+        assert not task.done()
+
+        hub.unsubscribe(second)
+        await asyncio.gather(task, return_exceptions=True)
+        return task.cancelled(), hub.stats()
+
+    cancelled, stats = client.portal.call(scenario)
+    assert cancelled
+    assert stats["bots"] == 0 and stats["subscriptions"] == 0
+
+
+def test_slow_subscriber_only_gets_latest_update(client):
+    async def scenario():
+        hub = _hub()
+        subscriber = BotStreamSubscriber()
+        hub.subscribe(subscriber, _target(), 0)
+        # Let several polls publish before the subscriber reads anything
+        while hub.polls < 3:
+            await asyncio.sleep(0.01)
+        messages = await subscriber.next_messages()
+        latest = hub._topics["ext_stream"].last_message
+        polls = hub.manager.calls
+        await hub.stop()
+        return messages, latest, polls
+
+    messages, latest, polls = client.portal.call(scenario)
+    assert polls >= 3
+    assert messages == [latest]
+    message = json.loads(messages[0])
+    assert message["type"] == "status_update"
+    assert message["data"] == {"trades": [{"trade_id": polls}]}
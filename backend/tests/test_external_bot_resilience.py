@@ -0,0 +1,130 @@
+"""
+Upstream protection in the external bot manager: stale-while-revalidate,
+single-flight, the circuit breaker and latency-derived timeouts.
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services import external_bot_manager as manager_module
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.external_bot_manager import ExternalBotManager
+from app.services.latency_tracker import HostLatencyTracker
+
+PATH = "/api/v1/status"
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    """Manager whose upstream GET is a counted fake with a short cache TTL"""
+    monkeypatch.setattr(manager_module, "EXTERNAL_BOT_CACHE_TTLS", {PATH: 0.05})
+    monkeypatch.setattr(manager_module, "EXTERNAL_BOT_CACHE_STALE_FACTOR", 100)
+    bot_manager = ExternalBotManager()
+    bot_manager.fetches = 0
+
+    async def fetch_json(api_url, path, headers, params, failure_message, error_message):
+        bot_manager.fetches += 1
+        await asyncio.sleep(0.02)
+        return {"success": True, "data": {"fetch": bot_manager.fetches}, "timestamp": "2024-01-01T00:00:00"}
+
+    bot_manager._fetch_json = fetch_json
+    return bot_manager
+
+
+def _get(bot_manager: ExternalBotManager):
+    return bot_manager._get_json("http://bot.test:8080", PATH, {}, None, "failed", "error")
+
+
+def test_concurrent_misses_share_one_upstream_call(manager):
+    async def scenario():
+        return await asyncio.gather(*(_get(manager) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert manager.fetches == 1
+    assert manager.coalesced_calls == 4
+    assert all(result["data"] == {"fetch": 1} for result in results)
+
+
+def test_stale_hit_is_served_and_refreshed_once(manager):
+    async def scenario():
+        await _get(manager)
+        await asyncio.sleep(0.06)
+        stale = await asyncio.gather(*(_get(manager) for _ in range(5)))
+        await asyncio.gather(*manager._refresh_tasks)
+        return stale, await _get(manager)
+
+    stale, refreshed = asyncio.run(scenario())
+
+    assert all(result["data"] == {"fetch": 1} for result in stale)
+    assert manager.fetches == 2
+    assert refreshed["data"] == {"fetch": 2}
+
+
+def _open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker("bot", failure_threshold=2, recovery_timeout=0.05, half_open_max_calls=1)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    time.sleep(0.06)
+    return breaker
+
+
+def test_half_open_allows_one_trial_then_closes_on_success():
+    breaker = _open_breaker()
+
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_half_open_trial_failure_reopens():
+    breaker = _open_breaker()
+
+    breaker.before_call()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def _tracker() -> HostLatencyTracker:
+    return HostLatencyTracker(
+        default_timeout=(3.0, 10.0),
+        connect_bounds=(0.5, 5.0),
+        read_bounds=(1.0, 30.0),
+        endpoint_multipliers={"/api/v1/trades": 4.0},
+        safety_factor=3.0,
+        alpha=0.2,
+        window=50,
+        min_samples=5,
+    )
+
+
+def test_timeouts_use_defaults_until_enough_samples():
+    tracker = _tracker()
+    for _ in range(4):
+        tracker.observe(PATH, 0.1)
+
+    assert tracker.timeouts_for(PATH) == (3.0, 10.0)
+
+
+def test_timeouts_are_clamped_to_floor_and_ceiling():
+    slow, fast = _tracker(), _tracker()
+    for _ in range(5):
+        slow.observe(PATH, 60.0)
+        fast.observe(PATH, 0.001)
+
+    assert slow.timeouts_for(PATH) == (5.0, 30.0)
+    assert slow.timeouts_for("/api/v1/trades") == (5.0, 30.0)
+    assert fast.timeouts_for(PATH) == (0.5, 1.0)
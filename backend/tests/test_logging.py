@@ -0,0 +1,63 @@
+"""
+EventSamplingFilter: suppressed records are reported even when nothing else
+is logged afterwards.
+"""
+import logging
+import time
+from typing import List
+
+import pytest
+
+from app.core.logging import EventSamplingFilter
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+@pytest.fixture
+def reports():
+    handler = _Capture()
+    logger = logging.getLogger("app.logging")
+    logger.addHandler(handler)
+    yield handler.records
+    logger.removeHandler(handler)
+
+
+def _suppressed_record() -> logging.LogRecord:
+    record = logging.LogRecord("app.test", logging.INFO, "", 0, "noisy", None, None)
+    record.event_type = "noisy"
+    return record
+
+
+def _suppression_reports(records: List[logging.LogRecord]) -> list:
+    return [record.suppressed for record in records if getattr(record, "event_type", None) == "log_records_suppressed"]
+
+
+def test_stop_reporting_reports_remaining_suppressed_counts(reports):
+    sampling_filter = EventSamplingFilter(sample_rates={"noisy": 0.0}, rate_limits={}, report_interval=3600)
+
+    assert not any(sampling_filter.filter(_suppressed_record()) for _ in range(3))
+    assert _suppression_reports(reports) == []
+
+    sampling_filter.stop_reporting()
+    assert _suppression_reports(reports) == [{"noisy": {"sampled": 3, "rate_limited": 0}}]
+
+
+def test_reporter_thread_reports_without_later_records(reports):
+    sampling_filter = EventSamplingFilter(sample_rates={"noisy": 0.0}, rate_limits={}, report_interval=0.05)
+    sampling_filter.start_reporting()
+    try:
+        sampling_filter.filter(_suppressed_record())
+        deadline = time.monotonic() + 2
+        while not _suppression_reports(reports) and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        sampling_filter.stop_reporting()
+
+    assert _suppression_reports(reports) == [{"noisy": {"sampled": 1, "rate_limited": 0}}]
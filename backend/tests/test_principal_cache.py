@@ -0,0 +1,24 @@
+"""
+Principal cache: cached users must not outlive changes to the user row.
+"""
+from app.core.principal_cache import principal_cache
+from app.db.session import SessionLocal
+from app.models import user as models_user
+
+
+def test_deactivating_user_invalidates_cached_principal(client, user, auth_headers):
+    token = auth_headers["Authorization"].split(" ", 1)[1]
+    assert client.get("/api/v1/external-bots/", headers=auth_headers).status_code == 200
+    assert principal_cache.get(token) is not None
+
+    db = SessionLocal()
+    try:
+        db.get(models_user.User, user.id).is_active = False
+        db.commit()
+    finally:
+        db.close()
+
+    assert principal_cache.get(token) is None
+    response = client.get("/api/v1/external-bots/", headers=auth_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
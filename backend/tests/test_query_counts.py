@@ -0,0 +1,85 @@
+"""
+Statements issued against the bots table per external bot endpoint.
+
+Endpoints load and ownership-check a bot once and hand that instance to the
+crud layer, so a request must not select the same row again. Only statements
+run while a request is being handled are counted (RequestLoggingMiddleware
+sets request_query_stats for those), which leaves out the user lookup and
+background jobs such as the status write buffer.
+"""
+from typing import List
+
+import pytest
+from sqlalchemy import event
+
+from app.db import session as db_session
+from app.db.instrumentation import request_query_stats
+from app.services.external_bot_manager import external_bot_manager
+
+
+@pytest.fixture
+def bot_statements():
+    """SQL statements on the bots table executed inside requests"""
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if request_query_stats.get() is not None and " bots" in statement:
+            statements.append(" ".join(statement.split()).upper())
+
+    engines = [db_session.engine, db_session.async_engine.sync_engine]
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    for engine in engines:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def stub_manager(monkeypatch):
+    """external_bot_manager answering every bot call successfully, without network"""
+
+    async def succeed(**kwargs):
+        return {"success": True, "data": {"status": "ok"}, "message": "ok", "timestamp": "2024-01-01T00:00:00"}
+
+    async def status(**kwargs):
+        return {"success": True, "data": [], "timestamp": "2024-01-01T00:00:00"}
+
+    monkeypatch.setattr(external_bot_manager, "start_bot", succeed)
+    monkeypatch.setattr(external_bot_manager, "stop_bot", succeed)
+    monkeypatch.setattr(external_bot_manager, "get_bot_status", status)
+
+
+def _count(statements: List[str], keyword: str) -> int:
+    return sum(1 for statement in statements if statement.startswith(keyword))
+
+
+@pytest.mark.parametrize("action, status", [("start", "starting"), ("stop", "stopping")])
+def test_start_stop_select_once_and_update_once(
+    client, auth_headers, external_bot, stub_manager, bot_statements, action, status
+):
+    response = client.post(f"/api/v1/external-bots/{external_bot.bot_id}/{action}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["success"] is True
+    assert _count(bot_statements, "SELECT") == 1
+    assert _count(bot_statements, "UPDATE BOTS") == 1
+    assert len(bot_statements) == 2
+
+
+def test_disconnect_selects_once_and_deletes_once(client, auth_headers, external_bot, stub_manager, bot_statements):
+    response = client.delete(f"/api/v1/external-bots/{external_bot.bot_id}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert _count(bot_statements, "SELECT") == 1
+    assert _count(bot_statements, "DELETE FROM BOTS") == 1
+    assert len(bot_statements) == 2
+
+
+def test_status_selects_once(client, auth_headers, external_bot, stub_manager, bot_statements):
+    response = client.get(f"/api/v1/external-bots/{external_bot.bot_id}/status", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "running"
+    # The status change goes through the write buffer, not the request
+    assert bot_statements == [bot_statements[0]]
+    assert bot_statements[0].startswith("SELECT")
@@ -0,0 +1,107 @@
+"""
+BotStatusWriteBuffer: coalescing of status writes, the last_ping resolution
+and bulk flushing.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+from sqlalchemy import event
+
+from app.db import session as db_session
+from app.db.session import SessionLocal
+from app.models import bot as models_bot
+from app.services.status_writer import BotStatusWriteBuffer
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def writer(client):
+    return BotStatusWriteBuffer(interval=3600, ping_resolution=60)
+
+
+@pytest.fixture
+def bot_updates():
+    """(statement, executemany) of every UPDATE on the bots table"""
+    updates: List[tuple] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE bots"):
+            updates.append((statement, executemany))
+
+    engine = db_session.async_engine.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield updates
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _stored(bot_id: int) -> models_bot.Bot:
+    db = SessionLocal()
+    try:
+        return db.get(models_bot.Bot, bot_id)
+    finally:
+        db.close()
+
+
+def test_record_coalesces_to_latest_values(client, writer, external_bot):
+    writer.seed(external_bot, writer.version)
+    writer.record(external_bot.id, status="error", connection_error="refused")
+    writer.record(external_bot.id, status="running", connection_error=None, last_ping=NOW)
+
+    assert client.portal.call(writer.flush) == 1
+    stored = _stored(external_bot.id)
+    assert (stored.status, stored.connection_error) == ("running", None)
+    assert writer.stats()["flushes"] == 1
+
+
+def test_unchanged_values_and_frequent_pings_are_skipped(client, writer, external_bot):
+    writer.seed(external_bot, writer.version)
+    writer.record(external_bot.id, status="running", last_ping=NOW)
+    client.portal.call(writer.flush)
+
+    writer.record(external_bot.id, status="running", last_ping=NOW + timedelta(seconds=30))
+    assert client.portal.call(writer.flush) == 0
+    assert writer.skipped == 1
+
+    writer.record(external_bot.id, status="running", last_ping=NOW + timedelta(seconds=60))
+    assert client.portal.call(writer.flush) == 1
+
+
+def test_flush_writes_all_bots_in_one_executemany(client, writer, user, bot_updates):
+    db = SessionLocal()
+    try:
+        bots = [
+            models_bot.Bot(bot_id=f"ext_many_{i}_{user.id}", tenant_id=user.tenant_id, bot_type="external",
+                           name="bot", api_url="http://bot.test:8080", status="connected")
+            for i in range(3)
+        ]
+        db.add_all(bots)
+        db.commit()
+        bot_ids = [bot.id for bot in bots]
+    finally:
+        db.close()
+    for id in bot_ids:
+        writer.record(id, status="running", connection_error=None)
+
+    assert client.portal.call(writer.flush) == 3
+    assert len(bot_updates) == 1
+    assert bot_updates[0][1] is True
+
+
+def test_seed_loaded_before_a_flush_does_not_hide_its_write(client, writer, external_bot):
+    writer.seed(external_bot, writer.version)
+    version = writer.version
+    # Row loaded before the flush below committed
+    stale = _stored(external_bot.id)
+    writer.record(external_bot.id, status="running")
+    client.portal.call(writer.flush)
+
+    writer.seed(stale, version)
+    writer.record(external_bot.id, status="running")
+    assert client.portal.call(writer.flush) == 0
+
+    # Seeded from the stale row, going back to its status would be skipped
+    writer.record(external_bot.id, status="connected")
+    assert client.portal.call(writer.flush) == 1
+    assert _stored(external_bot.id).status == "connected"
@@ -0,0 +1,139 @@
+"""
+Trade sync: mapping the bot's trades onto rows, idempotent upserts and where
+each sync resumes reading the bot's id-ordered trade list.
+"""
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import pytest
+
+from app.crud import crud_trade
+from app.db.session import SessionLocal
+from app.services.trade_sync import TradeSyncer, trade_row_from_api
+
+Target = namedtuple(
+    "Target", "id bot_id tenant_id api_url auth_method api_token username password"
+)
+
+
+class FakeTradesApi:
+    """Serves a bot's closed trades by limit/offset in trade_id order, like /api/v1/trades"""
+
+    def __init__(self, trade_ids: List[int]):
+        self.trade_ids = sorted(trade_ids)
+        self.offsets: List[int] = []
+
+    async def get_bot_trades(self, limit: int, offset: int, use_cache: bool = True, **kwargs) -> Dict[str, Any]:
+        self.offsets.append(offset)
+        page = self.trade_ids[offset:offset + limit]
+        trades = [{"trade_id": trade_id, "pair": "BTC/USDT", "profit_abs": float(trade_id)} for trade_id in page]
+        return {
+            "success": True,
+            "data": {"trades": trades, "trades_count": len(trades), "total_trades": len(self.trade_ids)},
+        }
+
+
+@pytest.fixture
+def target(client, external_bot):
+    return Target(
+        external_bot.id, external_bot.bot_id, external_bot.tenant_id, external_bot.api_url,
+        "token", "token", None, None,
+    )
+
+
+def _stored_ids(bot_id: str) -> List[int]:
+    db = SessionLocal()
+    try:
+        return sorted(trade.trade_id for trade in crud_trade.get_trades(db, bot_id=bot_id, limit=1000))
+    finally:
+        db.close()
+
+
+def _sync(client, api: FakeTradesApi, target: Target) -> int:
+    syncer = TradeSyncer(manager=api, page_size=3, overlap=2)
+    return client.portal.call(syncer.sync_bot, target)
+
+
+def test_trade_row_from_api_maps_timestamps_and_legacy_fields():
+    row = trade_row_from_api(
+        {
+            "trade_id": 7,
+            "pair": "ETH/USDT",
+            "open_timestamp": 1704067200000,
+            "close_timestamp": None,
+            "close_profit_abs": 1.5,
+            "close_profit": 0.02,
+            "sell_reason": "roi",
+        },
+        bot_id="bot",
+        tenant_id="tenant",
+    )
+
+    assert row["trade_id"] == 7
+    assert row["open_date"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert row["close_date"] is None
+    assert row["is_open"] is False
+    assert (row["profit_abs"], row["profit_ratio"], row["exit_reason"]) == (1.5, 0.02, "roi")
+
+
+def test_upsert_is_idempotent_on_bot_and_trade_id(target):
+    rows = [trade_row_from_api({"trade_id": 1, "profit_abs": 1.0}, target.bot_id, target.tenant_id)]
+    db = SessionLocal()
+    try:
+        crud_trade.upsert_trades(db, rows)
+        rows[0]["profit_abs"] = 2.0
+        crud_trade.upsert_trades(db, rows)
+
+        assert crud_trade.count_trades(db, bot_id=target.bot_id) == 1
+        assert crud_trade.get_trades(db, bot_id=target.bot_id)[0].profit_abs == 2.0
+    finally:
+        db.close()
+
+
+def test_first_sync_pages_through_all_trades(client, target):
+    api = FakeTradesApi(list(range(1, 8)))
+
+    assert _sync(client, api, target) == 7
+    assert _stored_ids(target.bot_id) == list(range(1, 8))
+    assert api.offsets == [0, 3, 6]
+
+
+def test_resume_rereads_window_below_highest_stored_id(client, target):
+    api = FakeTradesApi(list(range(1, 8)))
+    _sync(client, api, target)
+    api.trade_ids += [8, 9]
+    api.offsets.clear()
+
+    _sync(client, api, target)
+
+    # Watermark 7 - 2 = 5 sits at offset 5; one trade earlier to verify it
+    assert api.offsets == [4, 7]
+    assert _stored_ids(target.bot_id) == list(range(1, 10))
+
+
+def test_late_close_below_window_triggers_full_reread(client, target):
+    api = FakeTradesApi([1, 3, 4, 5, 6, 7])
+    _sync(client, api, target)
+    # Trade 2 closes after trades up to 7 were synced, below the re-read window
+    api.trade_ids = [1, 2, 3, 4, 5, 6, 7]
+    api.offsets.clear()
+
+    _sync(client, api, target)
+
+    # The window check passes, the total_trades check catches the gap
+    assert api.offsets == [3, 6, 0, 3, 6]
+    assert _stored_ids(target.bot_id) == list(range(1, 8))
+
+
+def test_pruned_upstream_history_is_detected(client, target):
+    api = FakeTradesApi(list(range(1, 8)))
+    _sync(client, api, target)
+    # The bot dropped its oldest trades and gained new ones
+    api.trade_ids = list(range(4, 12))
+    api.offsets.clear()
+
+    _sync(client, api, target)
+
+    assert 0 in api.offsets
+    assert _stored_ids(target.bot_id) == list(range(1, 12))
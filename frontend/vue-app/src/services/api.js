@@ -41,8 +41,10 @@ export default {
   getExternalBotPerformance(botId) {
     return apiClient.get(`/api/v1/external-bots/${botId}/performance`);
   },
-  getExternalBotTrades(botId, limit = 50) {
-    return apiClient.get(`/api/v1/external-bots/${botId}/trades`, { params: { limit } });
+  // Pages newest first; pass the previous page's next_before as `before` for older trades
+  getExternalBotTrades(botId, limit = 50, before = null) {
+    const params = before === null ? { limit } : { limit, before };
+    return apiClient.get(`/api/v1/external-bots/${botId}/trades`, { params });
   },
   disconnectExternalBot(botId) {
     return apiClient.delete(`/api/v1/external-bots/${botId}`);
@@ -92,8 +94,10 @@ export default {
   getBotPerformance(botId) {
     return apiClient.get(`/api/v1/bots/${botId}/performance`);
   },
-  getBotTrades(botId, limit = 50) {
-    return apiClient.get(`/api/v1/bots/${botId}/trades`, { params: { limit } });
+  // Returns { trades, total_count, next_before }; pass next_before as `before` for the next (older) page
+  getBotTrades(botId, limit = 50, before = null) {
+    const params = before === null ? { limit } : { limit, before };
+    return apiClient.get(`/api/v1/bots/${botId}/trades`, { params });
   },
   
   // Bot Configuration